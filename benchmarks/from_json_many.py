@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+'''
+Benchmark for converting a page of OParl objects.
+
+Compares the per-item time of ``from_json`` and ``from_json_many`` for a
+page of 1000 papers, which roughly resembles the pages served by real
+OParl servers. Run it from the repository's root directory::
+
+    python benchmarks/from_json_many.py
+'''
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import oparl
+
+
+PAGE_SIZE = 1000
+
+REPEAT = 5
+
+
+def paper(i):
+    base = 'https://oparl.example.org/oparl'
+    return {
+        'id': '{}/paper/{}'.format(base, i),
+        'type': 'https://schema.oparl.org/1.0/Paper',
+        'body': '{}/body/1'.format(base),
+        'name': 'Antrag Nummer {}'.format(i),
+        'reference': '2016/{:04d}'.format(i),
+        'date': '2016-09-{:02d}'.format(i % 30 + 1),
+        'paperType': 'Antrag',
+        'created': '2016-09-{:02d}T10:00:00+02:00'.format(i % 30 + 1),
+        'modified': '2016-10-01T09:30:00+02:00',
+        'originatorPerson': ['{}/person/{}'.format(base, i % 50),
+                             '{}/person/{}'.format(base, i % 70)],
+        'underDirectionOf': ['{}/organization/{}'.format(base, i % 10)],
+        'mainFile': {
+            'id': '{}/file/{}'.format(base, i),
+            'type': 'https://schema.oparl.org/1.0/File',
+            'name': 'Antrag',
+            'accessUrl': '{}/file/{}/content'.format(base, i),
+            'date': '2016-09-{:02d}'.format(i % 30 + 1),
+            'modified': '2016-10-01T09:30:00+02:00',
+        },
+        'consultation': [{
+            'id': '{}/consultation/{}'.format(base, i),
+            'type': 'https://schema.oparl.org/1.0/Consultation',
+            'paper': '{}/paper/{}'.format(base, i),
+            'meeting': '{}/meeting/{}'.format(base, i % 20),
+            'organization': ['{}/organization/{}'.format(base, i % 10)],
+        }],
+    }
+
+
+def main():
+    page = [paper(i) for i in range(PAGE_SIZE)]
+    for name, func in [
+        ('from_json', lambda: [oparl.from_json(data) for data in page]),
+        ('from_json_many', lambda: oparl.from_json_many(page)),
+    ]:
+        best = min(timeit.repeat(func, number=1, repeat=REPEAT))
+        print('{:<16}{:8.1f} us per item'.format(name,
+                                                 best / PAGE_SIZE * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -42,7 +42,8 @@ using the ``from_id`` function::
     import oparl
     system = oparl.from_id('https://politik-bei-uns.de/oparl')
 
-If you've already got OParl JSON data you can also use ``from_json``.
+If you've already got OParl JSON data you can also use ``from_json`` (or
+``from_json_many`` for a list of objects).
 
 Instances of ``Object`` and its subclasses support a read-only dict-
 interface::
@@ -57,9 +58,28 @@ trigger a ``SpecificationWarning``. If invalid values are encountered
 during auto-conversion (e.g. illegal date strings) then a
 ``ContentWarning`` is issued and conversion is skipped.
 
+HTTP requests use the connect and read timeouts from ``TIMEOUT``. The
+total duration of network operations can be limited using the
+``deadline`` context manager, via the ``deadline`` arguments of
+``from_id`` and ``Object.load`` or globally via ``DEADLINE``. If
+``HEDGE_PERCENTILE`` is set then slow requests are hedged by sending a
+second request for the same URL.
+
 By default, HTTPS certificates are verified. You can disable that
 verification by setting ``VERIFY_HTTPS`` to ``False``.
 
+If you need to follow references between objects backwards (e.g. to
+find all memberships of an organization) then assign an instance of
+``oparl.index.Index`` to ``INDEX``.
+
+JSON data is requested using HTTP compression (``gzip``, and also
+Brotli and Zstandard if the corresponding packages are installed). The
+number of transferred bytes is recorded in ``stats``. Downloaded JSON
+can be cached on disk by setting ``CACHE`` to an instance of
+``oparl.cache.FileCache``. Local copies of OParl data (e.g. dumps) can
+be registered in ``SOURCES`` (see ``oparl.sources``), in which case
+objects are loaded from them instead of the network.
+
 The libraries logger (``log``) doesn't have a handler attached to it by
 default, but may come in handy during development.
 '''
@@ -68,15 +88,23 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import collections
+import contextlib
+import datetime
+import hashlib
 import json
 import logging
+import os
+import re
 import sys
+import threading
+import time
 from warnings import warn
 
-import dateutil.parser
-import requests
 import six
-from unidecode import unidecode
+
+# The heavier dependencies ``requests``, ``dateutil`` and ``unidecode``
+# are only imported once they are needed, so that ``import oparl`` stays
+# fast.
 
 
 log = logging.getLogger(__name__)
@@ -85,12 +113,77 @@ log = logging.getLogger(__name__)
 __version__ = '0.1.1'
 
 
+# Monotonic clock (if available)
+_now = getattr(time, 'monotonic', time.time)
+
+# Thread-local state (currently only the active deadline)
+_local = threading.local()
+
+# Latencies (in seconds) of recent requests, used for hedging
+_latencies = collections.deque(maxlen=100)
+
+# Objects that are currently being loaded (ID -> ``threading.Event``),
+# used to prevent concurrent loads of the same object
+_loads = {}
+_loads_lock = threading.Lock()
+
+# Downloads of JSON data that are currently running (URL -> ``_Download``)
+_downloads = {}
+_downloads_lock = threading.Lock()
+
+# Minimum number of recorded latencies required for hedging
+_MIN_HEDGE_SAMPLES = 20
+
+# Transfer statistics: number of ``requests``, the number of bytes
+# received (``compressed_bytes``), the number of bytes after
+# decompression (``uncompressed_bytes``) and the numbers of
+# ``cache_hits``, ``source_hits`` and ``hedged_requests``. Requests that
+# were answered by sharing the result of a running download for the
+# same URL are counted in ``coalesced_requests``.
+stats = collections.Counter()
+_stats_lock = threading.Lock()
+
+
 # Official OParl 1.0 schema URI
 SCHEMA_URI = 'https://schema.oparl.org/1.0'
 
 # Should HTTPS certificates be verified?
 VERIFY_HTTPS = True
 
+# Connect and read timeouts (in seconds) for HTTP requests
+TIMEOUT = (10, 60)
+
+# Default deadline (in seconds) for ``from_id``, ``Object.load`` and for
+# retrieving a page of an ``ExternalObjectList``. ``None`` means no
+# deadline.
+DEADLINE = None
+
+# If set, a second (hedged) request for the same URL is sent if the
+# first request takes longer than this percentile (0-100) of the
+# latencies of recent requests. The result of whichever request
+# finishes first is used.
+HEDGE_PERCENTILE = None
+
+# Maximum number of threads used for loading referenced objects
+# concurrently (see ``Object.load``)
+MAX_WORKERS = 8
+
+# Size (in bytes) of the chunks in which file contents are downloaded
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Local sources of OParl JSON data (e.g. instances of
+# ``oparl.sources.JSONLSource``). They are consulted in order before
+# data is downloaded.
+SOURCES = []
+
+# Optional cache for downloaded JSON data (e.g. an instance of
+# ``oparl.cache.FileCache``).
+CACHE = None
+
+# Optional ``oparl.index.Index`` instance. If set, the references of
+# every loaded object are recorded in it.
+INDEX = None
+
 
 class Warning(UserWarning):
     '''
@@ -116,10 +209,28 @@ class ContentWarning(Warning):
     pass
 
 
+class DeadlineExceeded(Exception):
+    '''
+    Error that an operation did not finish before its deadline.
+    '''
+    pass
+
+
+class ChecksumError(ValueError):
+    '''
+    Error that downloaded data does not match its checksum.
+    '''
+    pass
+
+
 def _class_from_type_uri(uri):
     '''
     Convert a type URI to a class.
     '''
+    try:
+        return _CLASSES_BY_URI[uri]
+    except KeyError:
+        pass
     parts = uri.rsplit('/', 1)
     if len(parts) != 2:
         raise ValueError('Invalid type URI "{uri}".'.format(uri=uri))
@@ -127,22 +238,429 @@ def _class_from_type_uri(uri):
         warn(('Invalid schema URI "{schema_uri}" in type URI "{type_uri}" '
              + '(should be "{oparl_uri}").').format(schema_uri=parts[0],
              type_uri=uri, oparl_uri=SCHEMA_URI), SpecificationWarning)
-    import oparl.objects
     try:
-        return getattr(sys.modules['oparl.objects'], parts[1])
-    except AttributeError:
+        return _CLASSES[parts[1]]
+    except KeyError:
         raise ValueError('Unknown type "{name}" in type URI "{uri}".'.format(
                          name=parts[1], uri=uri))
 
 
-def _get_json(url):
+def _count(key, n=1):
     '''
-    Download JSON from an URL and parse it.
+    Increase a counter in ``stats``.
+    '''
+    with _stats_lock:
+        stats[key] += n
+
+
+def _accept_encoding():
+    '''
+    Get the value for the ``Accept-Encoding`` HTTP header.
+
+    ``gzip`` and ``deflate`` are always supported. ``br`` (Brotli) and
+    ``zstd`` (Zstandard) are added if the necessary packages for
+    decoding them are installed.
+    '''
+    try:
+        from urllib3.util.request import ACCEPT_ENCODING
+        return ACCEPT_ENCODING
+    except ImportError:
+        return 'gzip,deflate'
+
+
+@contextlib.contextmanager
+def _deadline(seconds):
     '''
+    Context manager that sets a deadline for the current thread.
+
+    Network operations within the context raise ``DeadlineExceeded``
+    once ``seconds`` have passed. Nested deadlines can only shorten an
+    existing deadline. ``seconds`` may be ``None``, in which case the
+    current deadline is left unchanged.
+    '''
+    if seconds is None:
+        yield
+        return
+    previous = getattr(_local, 'deadline', None)
+    deadline = _now() + seconds
+    if previous is not None:
+        deadline = min(deadline, previous)
+    _local.deadline = deadline
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def deadline(seconds):
+    '''
+    Limit the duration of network operations.
+
+    Returns a context manager. Within the context, all network
+    operations of the current thread (e.g. ``from_id``, ``Object.load``
+    and the iteration over an ``ExternalObjectList``) together may take
+    at most ``seconds`` seconds. Otherwise ``DeadlineExceeded`` is
+    raised::
+
+        with oparl.deadline(30):
+            papers = list(body['paper'])
+    '''
+    return _deadline(seconds)
+
+
+def _remaining():
+    '''
+    Get the remaining time (in seconds) until the current deadline.
+
+    Returns ``None`` if there is no deadline. Raises
+    ``DeadlineExceeded`` if the deadline has passed.
+    '''
+    deadline = getattr(_local, 'deadline', None)
+    if deadline is None:
+        return None
+    remaining = deadline - _now()
+    if remaining <= 0:
+        raise DeadlineExceeded('Deadline exceeded.')
+    return remaining
+
+
+def _timeout():
+    '''
+    Get the timeout for an HTTP request.
+
+    Takes ``TIMEOUT`` and the current deadline into account.
+    '''
+    remaining = _remaining()
+    if remaining is None:
+        return TIMEOUT
+    if TIMEOUT is None:
+        return remaining
+    if isinstance(TIMEOUT, tuple):
+        return tuple(min(t, remaining) for t in TIMEOUT)
+    return min(TIMEOUT, remaining)
+
+
+def _fetch(url):
+    '''
+    Download JSON from an URL.
+
+    Returns the JSON as a UTF-8 encoded byte string.
+    '''
+    import requests
     log.debug('Downloading {url}'.format(url=url))
-    r = requests.get(url, verify=VERIFY_HTTPS)
-    r.raise_for_status()
-    return r.json()
+    start = _now()
+    r = requests.get(url, headers={'Accept-Encoding': _accept_encoding()},
+                     stream=True, verify=VERIFY_HTTPS, timeout=_timeout())
+    try:
+        r.raise_for_status()
+        chunks = []
+        for chunk in r.iter_content(DOWNLOAD_CHUNK_SIZE):
+            chunks.append(chunk)
+            _remaining()
+        content = b''.join(chunks)
+        _latencies.append(_now() - start)
+        _count('requests')
+        _count('compressed_bytes', r.raw.tell() or len(content))
+        _count('uncompressed_bytes', len(content))
+    finally:
+        r.close()
+    if r.encoding and r.encoding.lower().replace('-', '') != 'utf8':
+        content = content.decode(r.encoding).encode('utf-8')
+    return content
+
+
+def _hedge_delay():
+    '''
+    Get the delay after which a hedged request is sent.
+
+    Returns ``None`` if no hedged requests should be sent.
+    '''
+    if HEDGE_PERCENTILE is None or len(_latencies) < _MIN_HEDGE_SAMPLES:
+        return None
+    latencies = sorted(_latencies)
+    index = int(round(HEDGE_PERCENTILE / 100 * (len(latencies) - 1)))
+    return latencies[max(0, min(index, len(latencies) - 1))]
+
+
+def _fetch_hedged(url):
+    '''
+    Download JSON from an URL, using hedged requests if enabled.
+
+    See ``HEDGE_PERCENTILE``.
+    '''
+    delay = _hedge_delay()
+    if delay is None:
+        return _fetch(url)
+    results = six.moves.queue.Queue()
+    deadline = getattr(_local, 'deadline', None)
+
+    def work():
+        _local.deadline = deadline
+        try:
+            results.put((True, _fetch(url)))
+        except Exception:
+            results.put((False, sys.exc_info()))
+
+    def start():
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+
+    def wait(timeout):
+        try:
+            return results.get(timeout=timeout)
+        except six.moves.queue.Empty:
+            return None
+
+    def wait_until_deadline():
+        result = wait(_remaining())
+        if result is None:
+            raise DeadlineExceeded(('Deadline exceeded while downloading '
+                                   + '"{url}".').format(url=url))
+        return result
+
+    start()
+    remaining = _remaining()
+    result = wait(delay if remaining is None else min(delay, remaining))
+    if result is None:
+        log.debug('Sending hedged request for {url}'.format(url=url))
+        _count('hedged_requests')
+        start()
+        result = wait_until_deadline()
+        if not result[0]:
+            # The other request may still succeed
+            result = wait_until_deadline()
+    success, result = result
+    if not success:
+        six.reraise(*result)
+    return result
+
+
+def _get_json(url, cached=True):
+    '''
+    Download JSON from an URL and parse it.
+
+    The JSON is taken from the first of the ``SOURCES`` that contains
+    it. Otherwise, if ``CACHE`` is set then the JSON is taken from the
+    cache if possible. Set ``cached`` to false to bypass the sources and
+    the cache (the cache is still updated with the downloaded data in
+    that case).
+    '''
+    if cached:
+        for source in SOURCES:
+            data = source.get(url)
+            if data is not None:
+                _count('source_hits')
+                return data
+    if CACHE is not None and cached:
+        data = CACHE.get(url)
+        if data is not None:
+            _count('cache_hits')
+            return data
+    return _download_json(url)
+
+
+class _Download(object):
+    '''
+    A download that is in progress.
+
+    Used for sharing the result of a download between threads. If the
+    download failed because of the deadline of the downloading thread
+    then ``retry`` is true and the waiting threads download the URL
+    themselves.
+    '''
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.retry = False
+
+
+def _is_deadline_error(error, limited):
+    '''
+    Check if an error was caused by the deadline of the current thread.
+
+    ``limited`` is true if the current thread had a deadline when the
+    download was started. In that case, request timeouts may have been
+    shortened because of the deadline (see ``_timeout``).
+    '''
+    if isinstance(error, DeadlineExceeded):
+        return True
+    requests = sys.modules.get('requests')
+    return (limited and requests is not None
+            and isinstance(error, requests.exceptions.Timeout))
+
+
+def _download_json(url):
+    '''
+    Download JSON from an URL, parse it and store it in ``CACHE``.
+
+    If the same URL is already being downloaded by another thread then
+    no new request is made. Instead, the result of the running download
+    is shared. If the running download fails because of the other
+    thread's deadline then the download is retried.
+    '''
+    while True:
+        with _downloads_lock:
+            download = _downloads.get(url)
+            running = download is not None
+            if not running:
+                download = _downloads[url] = _Download()
+        if not running:
+            break
+        _count('coalesced_requests')
+        log.debug('Waiting for running download of {url}'.format(url=url))
+        if not download.done.wait(_remaining()):
+            raise DeadlineExceeded(('Deadline exceeded while downloading '
+                                   + '"{url}".').format(url=url))
+        if download.error is None:
+            return download.result
+        if not download.retry:
+            six.reraise(*download.error)
+        log.debug(('Retrying download of {url} that failed because of '
+                  + 'another thread\'s deadline').format(url=url))
+    limited = getattr(_local, 'deadline', None) is not None
+    try:
+        content = _fetch_hedged(url)
+        if CACHE is not None:
+            CACHE.set(url, content)
+        download.result = json.loads(content.decode('utf-8'))
+        return download.result
+    except Exception as e:
+        download.error = sys.exc_info()
+        download.retry = _is_deadline_error(e, limited)
+        raise
+    finally:
+        with _downloads_lock:
+            del _downloads[url]
+        download.done.set()
+
+
+def _hash_file(filename, hasher, chunk_size):
+    '''
+    Update a hash object with the contents of a file.
+    '''
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+
+
+def _download(url, filename, sha1=None, size=None, resume=True,
+              chunk_size=None):
+    '''
+    Download data from an URL into a file.
+
+    The data is streamed to disk in chunks of ``chunk_size`` bytes
+    (``DOWNLOAD_CHUNK_SIZE`` by default). While the download is in
+    progress the data is stored in the file ``filename + '.part'``,
+    which is renamed to ``filename`` once the download is complete.
+
+    If ``resume`` is true then an existing ``.part`` file is completed
+    using an HTTP range request. If ``filename`` already exists and
+    matches ``size`` and ``sha1`` then nothing is downloaded at all.
+
+    If ``sha1`` is given then the SHA1 checksum of the data is computed
+    while downloading and a ``ChecksumError`` is raised if it doesn't
+    match. In that case the downloaded data is removed.
+    '''
+    import requests
+    chunk_size = chunk_size or DOWNLOAD_CHUNK_SIZE
+    if sha1:
+        sha1 = sha1.lower()
+    if resume and os.path.isfile(filename):
+        if size is None or os.path.getsize(filename) == size:
+            if not sha1:
+                return
+            hasher = hashlib.sha1()
+            _hash_file(filename, hasher, chunk_size)
+            if hasher.hexdigest() == sha1:
+                return
+    part_filename = filename + '.part'
+    hasher = hashlib.sha1()
+    offset = 0
+    if resume and os.path.isfile(part_filename):
+        offset = os.path.getsize(part_filename)
+        if size is not None and offset > size:
+            offset = 0
+    headers = {'Accept-Encoding': 'identity'}
+    if offset:
+        headers['Range'] = 'bytes={offset}-'.format(offset=offset)
+    log.debug('Downloading {url} to {filename} (starting at byte '
+              '{offset})'.format(url=url, filename=filename, offset=offset))
+    r = requests.get(url, headers=headers, stream=True, verify=VERIFY_HTTPS,
+                     timeout=_timeout())
+    try:
+        if offset and r.status_code == 416:
+            # Range not satisfiable, i.e. the partial file is complete
+            mode = None
+        else:
+            r.raise_for_status()
+            if offset and r.status_code != 206:
+                log.debug('Server ignored range request for {url}'.format(
+                          url=url))
+                offset = 0
+            mode = 'ab' if offset else 'wb'
+        if offset and sha1:
+            _hash_file(part_filename, hasher, chunk_size)
+        if mode:
+            with open(part_filename, mode) as f:
+                for chunk in r.iter_content(chunk_size):
+                    _remaining()
+                    f.write(chunk)
+                    if sha1:
+                        hasher.update(chunk)
+    finally:
+        r.close()
+    if sha1 and hasher.hexdigest() != sha1:
+        os.remove(part_filename)
+        raise ChecksumError(('Data downloaded from "{url}" has SHA1 checksum '
+                            + '{actual} (should be {expected}).').format(
+                            url=url, actual=hasher.hexdigest(),
+                            expected=sha1))
+    if os.path.isfile(filename):
+        os.remove(filename)
+    os.rename(part_filename, filename)
+
+
+def _parallel_map(func, items, max_workers):
+    '''
+    Apply a function to items using multiple threads.
+
+    At most ``max_workers`` threads are used. Returns the list of
+    results (in the order of ``items``). If ``func`` raises an
+    exception for any item then the first such exception is re-raised
+    once all items have been processed.
+    '''
+    items = list(items)
+    results = [None] * len(items)
+    errors = []
+    queue = six.moves.queue.Queue()
+    for i, item in enumerate(items):
+        queue.put((i, item))
+    deadline = getattr(_local, 'deadline', None)
+
+    def work():
+        _local.deadline = deadline
+        while True:
+            try:
+                i, item = queue.get_nowait()
+            except six.moves.queue.Empty:
+                return
+            try:
+                results[i] = func(item)
+            except Exception:
+                errors.append((i, sys.exc_info()))
+
+    threads = [threading.Thread(target=work)
+               for _ in range(min(max_workers, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        six.reraise(*min(errors, key=lambda error: error[0])[1])
+    return results
 
 
 def from_json(data):
@@ -167,14 +685,233 @@ def from_json(data):
     return obj
 
 
-def from_id(id):
+def from_json_many(data):
+    '''
+    Initialize multiple OParl objects from JSON.
+
+    ``data`` is a sequence of raw OParl JSON data (e.g. the ``data`` list
+    of a page of an external list). Each entry is either a Python data
+    structure or a string.
+
+    Returns a list of the corresponding ``Object`` instances. The result
+    is the same as ``[from_json(d) for d in data]``, but conversion is
+    faster for large numbers of objects: The objects are grouped by type
+    and the values of each field are converted in a single batch.
+    '''
+    data = [json.loads(d) if isinstance(d, six.string_types) else d
+            for d in data]
+    objects = [None] * len(data)
+    groups = collections.OrderedDict()
+    for i, d in enumerate(data):
+        if not 'id' in d:
+            raise ValueError('JSON data does not have an `id` field.')
+        if not 'type' in d:
+            raise ValueError('JSON data does not have a `type` field.')
+        groups.setdefault(d['type'], []).append(i)
+    for type, indices in six.iteritems(groups):
+        cls = _class_from_type_uri(type)
+        group = _convert_group(cls, type, [data[i] for i in indices])
+        for i, obj in zip(indices, group):
+            objects[i] = obj
+    return objects
+
+
+def _convert_group(cls, type, data):
+    '''
+    Initialize multiple OParl objects of the same type from JSON.
+
+    ``cls`` is the class for the type URI ``type`` and ``data`` is a
+    list of parsed JSON data. Returns the list of the corresponding
+    instances of ``cls``.
+    '''
+    kinds = cls._field_kinds()
+    objects = []
+    # Field name -> (objects, values)
+    batches = collections.OrderedDict()
+    for d in data:
+        obj = cls(d['id'], type)
+        objects.append(obj)
+        for key, value in six.iteritems(d):
+            if key in kinds:
+                batch = batches.get(key)
+                if batch is None:
+                    batch = batches[key] = ([], [])
+                batch[0].append(obj)
+                batch[1].append(value)
+            else:
+                obj._data[key] = value
+    for field, (batch_objects, values) in six.iteritems(batches):
+        _convert_many(cls, field, kinds[field], batch_objects, values)
+    for obj in objects:
+        obj.loaded = True
+        if INDEX is not None:
+            INDEX.add(obj)
+    return objects
+
+
+def _convert_many(cls, field, kind, objects, values):
+    '''
+    Convert the values of a field for multiple objects.
+
+    ``objects`` are instances of ``cls`` and ``values`` are the
+    corresponding raw JSON values of the field ``field``, whose kind is
+    ``kind`` (see ``Object._field_kinds``). The converted values are
+    stored in the objects.
+
+    The results are the same as for ``Object._convert_value``, but some
+    work is shared between the objects: Identical date strings are only
+    parsed once, the classes of references are looked up once and
+    embedded objects are converted in a single batch.
+    '''
+    if kind in ('date', 'datetime'):
+        parse = getattr(cls, '_parse_' + kind)
+        parsed = {}
+        for obj, value in zip(objects, values):
+            try:
+                result = parsed[value]
+            except (KeyError, TypeError):
+                result = parse(obj, value, field)
+                if (result is not value
+                        and isinstance(value, six.string_types)):
+                    parsed[value] = result
+            obj._data[field] = result
+    elif kind in ('reference', 'reference_list'):
+        if kind == 'reference':
+            type = cls._REFERENCE_FIELDS[field]
+        else:
+            type = cls._REFERENCE_LIST_FIELDS[field]
+        reference_cls = _class_from_type_uri(type)
+        for obj, value in zip(objects, values):
+            if kind == 'reference':
+                if isinstance(value, dict):
+                    obj._data[field] = obj._parse_reference(value, field)
+                else:
+                    obj._data[field] = reference_cls(value, type)
+                continue
+            result = []
+            for v in obj._ensure_list(value, field):
+                if isinstance(v, dict):
+                    result.extend(obj._parse_reference_list([v], field))
+                else:
+                    result.append(reference_cls(v, type))
+            obj._data[field] = result
+    elif kind in ('object', 'object_list'):
+        # Embedded objects are collected and converted in one batch.
+        # Each entry is a tuple ``(target, key, data)``, the converted
+        # object is stored in ``target[key]``.
+        embedded = []
+        for obj, value in zip(objects, values):
+            if kind == 'object':
+                if _is_url(value):
+                    obj._data[field] = obj._parse_object(value, field)
+                else:
+                    embedded.append((obj._data, field, value))
+                continue
+            result = []
+            for v in obj._ensure_list(value, field):
+                if _is_url(v):
+                    result.extend(obj._parse_object_list([v], field))
+                else:
+                    embedded.append((result, len(result), v))
+                    result.append(None)
+            obj._data[field] = result
+        converted = from_json_many([data for _, _, data in embedded])
+        for (target, key, _), value in zip(embedded, converted):
+            target[key] = value
+    else:
+        for obj, value in zip(objects, values):
+            obj._data[field] = obj._convert_value(field, value)
+
+
+def from_id(id, deadline=None):
     '''
     Initialize an OParl object from its ID (URL).
 
     The object's data is downloaded and parsed. The resulting object is
     returned.
+
+    ``deadline`` is the maximum duration of the operation in seconds. It
+    defaults to ``DEADLINE``.
     '''
-    return from_json(_get_json(id))
+    with _deadline(DEADLINE if deadline is None else deadline):
+        return from_json(_get_json(id))
+
+
+_DATE_PATTERN = re.compile(r'^(\d{4})-(\d{2})-(\d{2})$')
+
+_DATETIME_PATTERN = re.compile(r'''
+    ^(\d{4})-(\d{2})-(\d{2})
+    T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6})\d*)?
+    (?:(Z)|([+-])(\d{2}):?(\d{2}))?$
+''', re.VERBOSE)
+
+# Time zones for UTC offsets (in minutes), used by ``_parse_datetime``
+_TIMEZONES = {}
+
+
+def _timezone(offset):
+    '''
+    Get a time zone for an UTC offset (in minutes).
+
+    Returns ``None`` if the standard library doesn't provide time zones
+    (Python 2).
+    '''
+    try:
+        return _TIMEZONES[offset]
+    except KeyError:
+        pass
+    try:
+        timezone = datetime.timezone
+    except AttributeError:
+        return None
+    tz = _TIMEZONES[offset] = timezone(datetime.timedelta(minutes=offset))
+    return tz
+
+
+def _parse_date(value):
+    '''
+    Parse a date string.
+
+    Dates in the format prescribed by OParl (``YYYY-MM-DD``) are parsed
+    directly, other formats are handled by ``dateutil``. Raises
+    ``ValueError`` if the string cannot be parsed.
+    '''
+    m = _DATE_PATTERN.match(value)
+    if m:
+        try:
+            return datetime.date(*[int(g) for g in m.groups()])
+        except ValueError:
+            pass
+    import dateutil.parser
+    return dateutil.parser.parse(value).date()
+
+
+def _parse_datetime(value):
+    '''
+    Parse a date-time string.
+
+    Date-times in the ISO 8601 format prescribed by OParl are parsed
+    directly, other formats are handled by ``dateutil``. Raises
+    ``ValueError`` if the string cannot be parsed.
+    '''
+    m = _DATETIME_PATTERN.match(value)
+    if m:
+        groups = m.groups()
+        tz = None
+        if groups[7]:
+            tz = _timezone(0)
+        elif groups[8]:
+            offset = int(groups[9]) * 60 + int(groups[10])
+            tz = _timezone(-offset if groups[8] == '-' else offset)
+        if tz is not None or not (groups[7] or groups[8]):
+            microsecond = int((groups[6] or '0').ljust(6, '0'))
+            try:
+                return datetime.datetime(*[int(g) for g in groups[:6]],
+                                         microsecond=microsecond, tzinfo=tz)
+            except ValueError:
+                pass
+    import dateutil.parser
+    return dateutil.parser.parse(value)
 
 
 def _lazy(id, type):
@@ -195,6 +932,75 @@ def _is_url(value):
     return isinstance(value, six.string_types) and value.startswith('http')
 
 
+def _neighbors(obj, fields):
+    '''
+    Get the OParl objects referenced by or embedded in an object.
+
+    If ``fields`` is not ``None`` then only the given fields are taken
+    into account. External object lists are not included.
+    '''
+    for field, value in six.iteritems(obj._data):
+        if fields is not None and field not in fields:
+            continue
+        if isinstance(value, Object):
+            yield value
+        elif isinstance(value, list):
+            for v in value:
+                if isinstance(v, Object):
+                    yield v
+
+
+def _expand(objects, depth, fields=None, max_workers=None):
+    '''
+    Load the objects referenced by objects.
+
+    The references are followed breadth-first up to the given depth:
+    ``depth=1`` loads the objects directly referenced by ``objects``,
+    ``depth=2`` also loads the objects referenced by those, and so on.
+    Embedded objects are traversed in the same way as references but do
+    not have to be downloaded.
+
+    If ``fields`` is not ``None`` then only references in the fields of
+    that name are followed. The objects of each level are downloaded
+    concurrently using up to ``max_workers`` threads (``MAX_WORKERS`` by
+    default). Each ID is downloaded at most once, even if it is
+    referenced multiple times.
+    '''
+    if fields is not None:
+        fields = set(fields)
+    max_workers = max_workers or MAX_WORKERS
+    # ID -> loaded instance, for all objects that have been visited
+    visited = dict((obj._data['id'], obj) for obj in objects)
+    level = list(objects)
+    for _ in range(depth):
+        next_level = []
+        pending = collections.OrderedDict()
+        for obj in level:
+            for neighbor in _neighbors(obj, fields):
+                id = neighbor._data['id']
+                if id in visited:
+                    neighbor._share(visited[id])
+                elif neighbor.loaded:
+                    visited[id] = neighbor
+                    next_level.append(neighbor)
+                else:
+                    pending.setdefault(id, []).append(neighbor)
+        if pending:
+            log.debug('Expanding {count} objects'.format(count=len(pending)))
+            ids = list(pending)
+            for id, data in zip(ids, _parallel_map(_get_json, ids,
+                                                   max_workers)):
+                instances = pending[id]
+                instances[0]._init_from_json(data)
+                for instance in instances[1:]:
+                    instance._share(instances[0])
+                visited[id] = instances[0]
+                next_level.append(instances[0])
+        if not next_level:
+            break
+        level = next_level
+
+
 class ExternalObjectList(collections.Sequence):
     '''
     (Lazy) list of OParl objects.
@@ -208,8 +1014,8 @@ class ExternalObjectList(collections.Sequence):
     further items are requested by indexing (``my_list[34]``) or by
     iterating over the list.
 
-    To prevent storing large lists completely in memory only the
-    currently requested page is stored. Random access to the list may
+    To prevent storing large lists completely in memory only the most
+    recently requested pages are stored. Random access to the list may
     therefore lead to repeated downloads of the same page. To download
     the complete list use ``my_list = list(my_list)``.
 
@@ -222,73 +1028,164 @@ class ExternalObjectList(collections.Sequence):
     Due to its dynamic nature, instances of this class only support non-
     negative integer indices. In particular, slicing and negative
     indices are not supported
+
+    Instances of this class can be shared between threads. Each iterator
+    over the list keeps its own position, and a page which is requested
+    by several threads at the same time is only downloaded once.
     '''
     # The only mandatory link between sub-pages of a paginated list in
     # OParl is ``next``. While OParl offers several other such links
     # (e.g. ``last``) these are optional. Similarly, OParl doesn't
     # require the server to mention the total number of items.
 
+    # Maximum number of sub-pages that are kept in memory
+    _MAX_CACHED_PAGES = 4
+
     def __init__(self, url):
         self.url = url
-        self._data = []
-        self._current_page_index = None
+        self._lock = threading.Lock()
+        # Offsets and URLs of the sub-pages discovered so far. The URL of
+        # the last entry is ``None`` once the end of the list is known.
         self._page_urls = [(0, url)]
-        self._offset = 0
+        # Recently used sub-pages (page index -> list of objects)
+        self._pages = collections.OrderedDict()
+        # Sub-pages that are currently being downloaded (page index ->
+        # ``threading.Event``)
+        self._loading = {}
         self._len = 0
 
     def __len__(self):
         return self._len
 
-    def _load_page_for_index(self, i):
+    def _get_page(self, page_index):
         '''
-        Loads the sub-page which contains an index.
+        Get a sub-page.
 
-        The page which contains the index ``i`` is loaded. If ``i`` is
-        larger than the number of items in the list then an
-        ``IndexError`` is raised.
+        Returns a tuple containing the page's offset and the list of the
+        page's objects. The page is downloaded if necessary. If several
+        threads request the same page at once then only one of them
+        downloads it while the others wait for it.
+
+        Sub-pages must be loaded incrementally, i.e. page ``i`` must be
+        loaded before page ``i + 1``.
         '''
-        j = 0
         while True:
-            if j == len(self._page_urls) - 1:
-                if self._page_urls[j][1] is None:
-                    raise IndexError()
-                self._load_page(j)
-            if self._page_urls[j + 1][0] > i:
-                self._load_page(j)
-                return
-            j += 1
+            with self._lock:
+                offset, url = self._page_urls[page_index]
+                page = self._pages.pop(page_index, None)
+                if page is not None:
+                    self._pages[page_index] = page
+                    return offset, page
+                event = self._loading.get(page_index)
+                if event is None:
+                    event = self._loading[page_index] = threading.Event()
+                    break
+            # Another thread is downloading the page
+            with _deadline(DEADLINE):
+                if not event.wait(_remaining()):
+                    raise DeadlineExceeded(('Deadline exceeded while '
+                                           + 'waiting for page {index} of '
+                                           + 'list "{url}".').format(
+                                           index=page_index, url=self.url))
+        try:
+            return offset, self._load_page(page_index, offset, url)
+        finally:
+            with self._lock:
+                del self._loading[page_index]
+            event.set()
 
-    def _load_page(self, page_index):
+    def _load_page(self, page_index, offset, url):
         '''
-        Load a sub-page.
+        Download a sub-page.
 
-        Sub-pages must be loaded incrementally, i.e. page ``i`` must be
-        loaded before page ``i + 1``.
+        Returns the list of the page's objects.
         '''
-        if page_index == self._current_page_index:
-            return
-        log.debug('Getting page {index} for list {url}'.format(
-                  index=page_index, url=self.url))
-        self._offset, url = self._page_urls[page_index]
         if url is None:
             raise IndexError()
-        data = _get_json(url)
-        self._data = [from_json(obj) for obj in data['data']]
-        next_offset = self._offset + len(self._data)
-        self._len = max(self._len, next_offset)
-        if page_index == len(self._page_urls) - 1:
-            next_url = data['links'].get('next')
-            self._page_urls.append((next_offset, next_url))
-        self._current_page_index = page_index
+        log.debug('Getting page {index} for list {url}'.format(
+                  index=page_index, url=self.url))
+        with _deadline(DEADLINE):
+            data = _get_json(url)
+        page = from_json_many(data['data'])
+        next_offset = offset + len(page)
+        with self._lock:
+            self._len = max(self._len, next_offset)
+            if page_index == len(self._page_urls) - 1:
+                next_url = data['links'].get('next')
+                self._page_urls.append((next_offset, next_url))
+            self._pages[page_index] = page
+            while len(self._pages) > self._MAX_CACHED_PAGES:
+                self._pages.popitem(last=False)
+        return page
+
+    def _iter_pages(self):
+        '''
+        Iterate over the list's sub-pages.
+
+        Yields the list of objects on each sub-page.
+        '''
+        page_index = 0
+        while True:
+            with self._lock:
+                url = self._page_urls[page_index][1]
+            if url is None:
+                return
+            yield self._get_page(page_index)[1]
+            page_index += 1
+
+    def _iter_raw_pages(self):
+        '''
+        Iterate over the raw JSON data of the list's sub-pages.
+
+        Yields the (unconverted) list of objects on each sub-page. The
+        pages are always downloaded and are not stored.
+        '''
+        url = self.url
+        while url is not None:
+            log.debug('Getting raw page {url} for list {list_url}'.format(
+                      url=url, list_url=self.url))
+            with _deadline(DEADLINE):
+                data = _get_json(url)
+            yield data['data']
+            url = data['links'].get('next')
+
+    def __iter__(self):
+        for page in self._iter_pages():
+            for obj in page:
+                yield obj
+
+    def expand(self, depth=1, fields=None, max_workers=None):
+        '''
+        Iterate over the list while loading referenced objects.
+
+        For each sub-page of the list, the objects referenced by the
+        page's objects are loaded concurrently before the objects are
+        yielded. See ``Object.load`` for the meaning of the arguments.
+        '''
+        for page in self._iter_pages():
+            _expand(page, depth, fields, max_workers)
+            for obj in page:
+                yield obj
 
     def __getitem__(self, i):
         if not isinstance(i, int) or i < 0:
             raise IndexError('Only non-negative integer indices are '
                              + 'supported.')
-        self._load_page_for_index(i)
-        return self._data[i - self._offset]
+        page_index = 0
+        while True:
+            with self._lock:
+                if (page_index + 1 < len(self._page_urls)
+                        and self._page_urls[page_index + 1][0] <= i):
+                    # The index is on a later page
+                    page_index += 1
+                    continue
+            offset, page = self._get_page(page_index)
+            if i < offset + len(page):
+                return page[i - offset]
+            page_index += 1
 
     def __repr__(self):
+        from unidecode import unidecode
         return unidecode('<OParl ExternalObjectList {url}>'.format(
                          url=self.url))
 
@@ -353,15 +1250,75 @@ class Object(collections.Mapping):
         self._data = {'id': id, 'type': type}
         self.loaded = False
 
-    def load(self, force=False):
+    def load(self, force=False, deadline=None, depth=0, fields=None,
+             max_workers=None):
         '''
         Load the object's data if it hasn't been loaded, yet.
 
-        If ``force`` is true then the data is always downloaded.
+        If ``force`` is true then the data is always downloaded (even if
+        it is available from ``CACHE``).
+
+        ``deadline`` is the maximum duration of the operation in seconds.
+        It defaults to ``DEADLINE``.
+
+        If ``depth`` is positive then the objects referenced by this
+        object are loaded, too, up to the given depth (see
+        ``_expand``). ``fields`` restricts this to the given field names
+        and ``max_workers`` is the number of concurrent downloads
+        (``MAX_WORKERS`` by default). For example, the following loads a
+        meeting, its organizations and participants, and the
+        consultations of its agenda items::
+
+            meeting.load(depth=2, fields=['organization', 'participant',
+                                          'agendaItem', 'consultation'])
         '''
-        if self.loaded and not force:
-            return
-        self._init_from_json(_get_json(self._data['id']))
+        with _deadline(DEADLINE if deadline is None else deadline):
+            if force or not self.loaded:
+                self._load(force)
+            if depth > 0:
+                _expand([self], depth, fields, max_workers)
+
+    def _load(self, force):
+        '''
+        Download the object's JSON data and initialize the object.
+
+        If several threads load the same object at once then only one of
+        them downloads it while the others wait for it (or until their
+        deadline is exceeded).
+        '''
+        id = self._data['id']
+        while True:
+            with _loads_lock:
+                event = _loads.get(id)
+                if event is None:
+                    event = _loads[id] = threading.Event()
+                    break
+            if not event.wait(_remaining()):
+                raise DeadlineExceeded(('Deadline exceeded while waiting '
+                                       + 'for "{id}" to be loaded.').format(
+                                       id=id))
+            # Another thread may have loaded the object meanwhile
+            if self.loaded and not force:
+                return
+        try:
+            if force:
+                self._init_from_json(_get_json(id, cached=False))
+            elif not self.loaded:
+                self._init_from_json(_get_json(id))
+        finally:
+            with _loads_lock:
+                del _loads[id]
+            event.set()
+
+    def _share(self, other):
+        '''
+        Share the data of another instance of the same OParl object.
+
+        Does nothing if this instance has already been loaded.
+        '''
+        if not self.loaded and other.loaded:
+            self._data = other._data
+            self.loaded = True
 
     def __getitem__(self, key):
         try:
@@ -389,21 +1346,41 @@ class Object(collections.Mapping):
         converted accordingly. Otherwise the value is returned
         unchanged.
         '''
-        if field in self._DATE_FIELDS:
-            return self._parse_date(value, field)
-        if field in self._DATETIME_FIELDS:
-            return self._parse_datetime(value, field)
-        if field in self._OBJECT_FIELDS:
-            return self._parse_object(value, field)
-        if field in self._OBJECT_LIST_FIELDS:
-            return self._parse_object_list(value, field)
-        if field in self._REFERENCE_FIELDS:
-            return self._parse_reference(value, field)
-        if field in self._REFERENCE_LIST_FIELDS:
-            return self._parse_reference_list(value, field)
-        if field in self._EXTERNAL_LIST_FIELDS:
-            return ExternalObjectList(value)
-        return value
+        kind = self._field_kinds().get(field)
+        if kind is None:
+            return value
+        return getattr(self, '_parse_' + kind)(value, field)
+
+    @classmethod
+    def _field_kinds(cls):
+        '''
+        Get the kinds of the class' fields.
+
+        Returns a dict that maps the names of fields with a special type
+        to the kind of their type (``'date'``, ``'datetime'``,
+        ``'object'``, ``'object_list'``, ``'reference'``,
+        ``'reference_list'`` or ``'external_list'``). Each kind has a
+        corresponding ``_parse_<kind>`` method. The dict is computed once
+        per class.
+        '''
+        try:
+            return cls.__dict__['_field_kinds_cache']
+        except KeyError:
+            pass
+        kinds = {}
+        # Reversed, so that the first matching kind wins
+        for kind, fields in reversed([
+                ('date', cls._DATE_FIELDS),
+                ('datetime', cls._DATETIME_FIELDS),
+                ('object', cls._OBJECT_FIELDS),
+                ('object_list', cls._OBJECT_LIST_FIELDS),
+                ('reference', cls._REFERENCE_FIELDS),
+                ('reference_list', cls._REFERENCE_LIST_FIELDS),
+                ('external_list', cls._EXTERNAL_LIST_FIELDS)]):
+            for field in fields:
+                kinds[field] = kind
+        cls._field_kinds_cache = kinds
+        return kinds
 
     def _ensure_list(self, value, field):
         if (not isinstance(value, collections.Sequence)
@@ -417,7 +1394,7 @@ class Object(collections.Mapping):
 
     def _parse_date(self, value, field):
         try:
-            return dateutil.parser.parse(value).date()
+            return _parse_date(value)
         except ValueError as e:
             warn(('In object "{id}": Field "{field}" contains an invalid '
                  + 'date string ("{value}"): {error}').format(
@@ -427,7 +1404,7 @@ class Object(collections.Mapping):
 
     def _parse_datetime(self, value, field):
         try:
-            return dateutil.parser.parse(value)
+            return _parse_datetime(value)
         except ValueError as e:
             warn(('In object "{id}": Field "{field}" contains an invalid '
                  + 'date-time string ("{value}"): {error}').format(
@@ -484,6 +1461,9 @@ class Object(collections.Mapping):
                 values.append(_lazy(v, obj_type))
         return values
 
+    def _parse_external_list(self, value, field):
+        return ExternalObjectList(value)
+
     def _init_from_json(self, data):
         '''
         Init the object from (parsed) JSON data.
@@ -505,6 +1485,8 @@ class Object(collections.Mapping):
         for key, value in six.iteritems(data):
             self._data[key] = self._convert_value(key, value)
         self.loaded = True
+        if INDEX is not None:
+            INDEX.add(self)
 
     def __repr__(self):
         s = '<oparl:{cls}'.format(cls=self.__class__.__name__)
@@ -515,5 +1497,14 @@ class Object(collections.Mapping):
         if name:
             s += ' ({name})'.format(name=name)
         s += '>'
+        from unidecode import unidecode
         return unidecode(s)
 
+
+# The object classes are imported last since they depend on the
+# definitions above.
+from .objects import _CLASSES
+
+# Type URI -> class, for quick lookups of valid type URIs
+_CLASSES_BY_URI = dict((SCHEMA_URI + '/' + name, cls)
+                       for name, cls in six.iteritems(_CLASSES))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+'''
+Caches for downloaded OParl JSON data.
+
+Assign an instance of one of these classes to ``oparl.CACHE`` to enable
+caching::
+
+    import oparl
+    from oparl.cache import FileCache
+
+    oparl.CACHE = FileCache('/path/to/cache')
+
+Cached data never expires. Use ``Object.load(force=True)`` to update an
+object from the server.
+'''
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+
+class FileCache(object):
+    '''
+    Cache that stores compressed JSON data in a directory.
+
+    Each URL's data is stored gzip-compressed in a separate file. The
+    data is decompressed on the fly while it is parsed.
+    '''
+    def __init__(self, directory, compresslevel=6):
+        self.directory = directory
+        self.compresslevel = compresslevel
+
+    def _filename(self, url):
+        '''
+        Get the name of the file that stores an URL's data.
+        '''
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], key[2:] + '.json.gz')
+
+    def get(self, url):
+        '''
+        Get the parsed JSON data for an URL.
+
+        Returns ``None`` if the URL is not in the cache.
+        '''
+        try:
+            f = gzip.open(self._filename(url), 'rb')
+        except IOError:
+            return None
+        with io.TextIOWrapper(f, encoding='utf-8') as text:
+            return json.load(text)
+
+    def set(self, url, content):
+        '''
+        Store the JSON data for an URL.
+
+        ``content`` is the UTF-8 encoded JSON data.
+        '''
+        filename = self._filename(url)
+        directory = os.path.dirname(filename)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Created concurrently
+                if not os.path.isdir(directory):
+                    raise
+        fd, temp_filename = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                with gzip.GzipFile(fileobj=f, mode='wb',
+                                   compresslevel=self.compresslevel) as g:
+                    g.write(content)
+            os.rename(temp_filename, filename)
+        except Exception:
+            os.remove(temp_filename)
+            raise
+
+    def __contains__(self, url):
+        return os.path.isfile(self._filename(url))
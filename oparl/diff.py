@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+'''
+Comparison of OParl snapshots.
+
+This module compares two snapshots of OParl data (for example two
+crawls of the same server) and reports which objects have been created,
+updated or deleted::
+
+    from oparl.diff import diff
+
+    with open('old.jsonl') as old, open('new.jsonl') as new:
+        for change in diff(old, new):
+            print(change.kind, change.id, change.fields)
+
+Snapshots are either iterables of objects sorted by ID (for example the
+lines of JSONL files) or mappings from IDs to objects (for example a
+``dict`` or a ``shelve``). Objects are given as raw OParl JSON data,
+either parsed or as strings.
+
+Sorted snapshots are compared in a single pass while only holding one
+object of each snapshot in memory at a time.
+'''
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import json
+
+import six
+
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+
+class Change(collections.namedtuple('Change',
+                                    ['kind', 'id', 'old', 'new', 'fields'])):
+    '''
+    A change between two snapshots.
+
+    ``kind`` is one of ``CREATED``, ``UPDATED`` and ``DELETED``. ``id``
+    is the ID of the changed object. ``old`` and ``new`` are the
+    object's JSON data in the old and new snapshot (``None`` if the
+    object is missing from the snapshot). For updates, ``fields`` is a
+    sorted list of the names of the changed fields. Otherwise it is
+    ``None``.
+    '''
+    __slots__ = ()
+
+
+def _parse(data):
+    if isinstance(data, (six.string_types, six.binary_type)):
+        if isinstance(data, six.binary_type):
+            data = data.decode('utf-8')
+        return json.loads(data)
+    return data
+
+
+def _is_deleted(data):
+    return data is None or bool(data.get('deleted'))
+
+
+def _compare(id, old, new, use_modified):
+    '''
+    Compare two versions of an object.
+
+    Returns a ``Change`` or ``None`` if the versions are equivalent.
+    '''
+    old_deleted = _is_deleted(old)
+    new_deleted = _is_deleted(new)
+    if old_deleted:
+        if new_deleted:
+            return None
+        return Change(CREATED, id, old, new, None)
+    if new_deleted:
+        return Change(DELETED, id, old, new, None)
+    if (use_modified and old.get('modified') is not None
+            and old.get('modified') == new.get('modified')):
+        return None
+    fields = sorted(key for key in set(old).union(new)
+                    if old.get(key) != new.get(key))
+    if not fields:
+        return None
+    return Change(UPDATED, id, old, new, fields)
+
+
+def _diff_sorted(old, new, use_modified):
+    '''
+    Compare two snapshots that are sorted by ID.
+    '''
+    def items(snapshot):
+        last_id = None
+        for data in snapshot:
+            if (isinstance(data, (six.string_types, six.binary_type))
+                    and not data.strip()):
+                continue
+            data = _parse(data)
+            try:
+                id = data['id']
+            except KeyError:
+                raise ValueError('JSON data does not have an `id` field.')
+            if last_id is not None and id <= last_id:
+                raise ValueError(('Snapshot is not sorted by ID ("{id}" '
+                                 + 'follows "{last_id}").').format(
+                                 id=id, last_id=last_id))
+            last_id = id
+            yield id, data
+
+    old = items(old)
+    new = items(new)
+    old_id, old_data = next(old, (None, None))
+    new_id, new_data = next(new, (None, None))
+    while old_id is not None or new_id is not None:
+        if new_id is None or (old_id is not None and old_id < new_id):
+            change = _compare(old_id, old_data, None, use_modified)
+            old_id, old_data = next(old, (None, None))
+        elif old_id is None or new_id < old_id:
+            change = _compare(new_id, None, new_data, use_modified)
+            new_id, new_data = next(new, (None, None))
+        else:
+            change = _compare(old_id, old_data, new_data, use_modified)
+            old_id, old_data = next(old, (None, None))
+            new_id, new_data = next(new, (None, None))
+        if change is not None:
+            yield change
+
+
+def _diff_indexed(old, new, use_modified):
+    '''
+    Compare two snapshots that map IDs to objects.
+    '''
+    for id in new:
+        old_data = old.get(id)
+        if old_data is not None:
+            old_data = _parse(old_data)
+        change = _compare(id, old_data, _parse(new[id]), use_modified)
+        if change is not None:
+            yield change
+    for id in old:
+        if id not in new:
+            change = _compare(id, _parse(old[id]), None, use_modified)
+            if change is not None:
+                yield change
+
+
+def diff(old, new, use_modified=True):
+    '''
+    Compare two snapshots of OParl data.
+
+    ``old`` and ``new`` are either both iterables of OParl JSON data
+    sorted by ID or both mappings from IDs to OParl JSON data.
+
+    Returns a generator of ``Change`` instances. Objects which are only
+    contained in ``new`` or whose ``deleted`` flag has been set are
+    reported as created or deleted, respectively.
+
+    If ``use_modified`` is true then objects whose ``modified`` fields
+    are equal are considered unchanged without comparing their other
+    fields.
+
+    A ``ValueError`` is raised if a sorted snapshot is not sorted by
+    ID.
+    '''
+    if (isinstance(old, collections.Mapping)
+            and isinstance(new, collections.Mapping)):
+        return _diff_indexed(old, new, use_modified)
+    return _diff_sorted(old, new, use_modified)
@@ -0,0 +1,347 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+'''
+Columnar export of external object lists.
+
+This module converts the contents of an ``ExternalObjectList`` (e.g.
+``body['paper']``) into columnar data structures, namely Apache Arrow
+record batches and pandas data frames. The conversion works directly on
+the raw JSON data of the list's pages, without creating ``Object``
+instances::
+
+    from oparl.export import to_dataframe
+
+    papers = to_dataframe(body['paper'], ['id', 'name', 'date',
+                                          'paperType', 'modified'])
+
+The list is processed page by page, so ``iter_record_batches`` and
+``iter_dataframes`` can be used to export large lists with bounded
+memory usage.
+
+Date and date-time fields are converted into the corresponding column
+types (date-times are normalized to UTC), invalid values become null.
+References and embedded objects are represented by their IDs.
+
+The functions in this module require pandas_ and/or pyarrow_, which are
+not installed automatically.
+
+.. _pandas: https://pandas.pydata.org
+.. _pyarrow: https://arrow.apache.org/docs/python/
+'''
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import importlib
+import json
+
+import six
+
+from . import _class_from_type_uri
+
+
+def _import(name):
+    '''
+    Import an optional dependency.
+    '''
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise ImportError(('The "{name}" package is required for this '
+                          + 'feature.').format(name=name))
+
+
+def _flatten(value):
+    '''
+    Replace embedded objects by their IDs.
+    '''
+    if isinstance(value, dict):
+        return value.get('id')
+    if isinstance(value, list):
+        return [_flatten(v) for v in value]
+    return value
+
+
+def _iter_columns(lst, fields):
+    '''
+    Iterate over the pages of an external list in columnar form.
+
+    Yields tuples ``(cls, fields, columns)`` where ``cls`` is the class
+    of the list's objects (or ``None`` if the list is empty), ``fields``
+    is the list of field names and ``columns`` is a list containing a
+    list of values for each field.
+
+    If ``fields`` is ``None`` then the fields of the objects on the
+    first page are used.
+    '''
+    cls = None
+    for rows in lst._iter_raw_pages():
+        if cls is None and rows:
+            cls = _class_from_type_uri(rows[0]['type'])
+        if fields is None:
+            if not rows:
+                continue
+            fields = []
+            for row in rows:
+                fields.extend(key for key in row if key not in fields)
+        columns = [[_flatten(row.get(field)) for row in rows]
+                   for field in fields]
+        yield cls, fields, columns
+
+
+def _is_date_field(cls, field):
+    return cls is not None and field in cls._DATE_FIELDS
+
+
+def _is_datetime_field(cls, field):
+    return cls is not None and field in cls._DATETIME_FIELDS
+
+
+def _arrow_timestamps(pyarrow, values):
+    '''
+    Convert a list of date-time strings into an Arrow array.
+
+    Invalid values are converted to null. Values without time zone
+    information are interpreted as UTC.
+    '''
+    timestamp = pyarrow.timestamp('us', tz='UTC')
+    try:
+        return pyarrow.array(values, pyarrow.string()).cast(timestamp)
+    except pyarrow.ArrowInvalid:
+        pass
+    # Convert the values one by one, so that only the invalid ones are
+    # lost. The result contains microseconds since the epoch.
+    microseconds = []
+    for value in values:
+        result = None
+        if value is not None:
+            string = pyarrow.array([value], pyarrow.string())
+            for type in (timestamp, pyarrow.timestamp('us')):
+                try:
+                    result = string.cast(type).cast(pyarrow.int64())[0]
+                    break
+                except pyarrow.ArrowInvalid:
+                    pass
+        microseconds.append(None if result is None else result.as_py())
+    return pyarrow.array(microseconds, pyarrow.int64()).cast(timestamp)
+
+
+def _is_undetermined(pyarrow, type):
+    '''
+    Check if an Arrow type was inferred from values without information.
+
+    That is the case for null values and for (nested) lists of nulls,
+    e.g. for empty lists.
+    '''
+    if pyarrow.types.is_null(type):
+        return True
+    if pyarrow.types.is_list(type):
+        return _is_undetermined(pyarrow, type.value_type)
+    return False
+
+
+def _merge_types(pyarrow, a, b):
+    '''
+    Get an Arrow type that can hold the values of two types.
+
+    Null types are replaced by the other type and integers are widened
+    to floating point numbers. Returns ``None`` if the types are
+    incompatible.
+    '''
+    if a == b:
+        return a
+    if pyarrow.types.is_null(a):
+        return b
+    if pyarrow.types.is_null(b):
+        return a
+    if pyarrow.types.is_list(a) and pyarrow.types.is_list(b):
+        value_type = _merge_types(pyarrow, a.value_type, b.value_type)
+        if value_type is None:
+            return None
+        return pyarrow.list_(value_type)
+    numeric = (pyarrow.types.is_integer, pyarrow.types.is_floating)
+    if (any(is_type(a) for is_type in numeric)
+            and any(is_type(b) for is_type in numeric)):
+        return pyarrow.float64()
+    return None
+
+
+def _declared_type(pyarrow, cls, field):
+    '''
+    Get the Arrow type of a field from the class' field tables.
+
+    References and embedded objects are represented by their IDs.
+    Returns ``None`` for fields without a special type.
+    '''
+    if cls is None:
+        return None
+    kind = cls._field_kinds().get(field)
+    if kind in ('reference', 'object'):
+        return pyarrow.string()
+    if kind in ('reference_list', 'object_list'):
+        return pyarrow.list_(pyarrow.string())
+    return None
+
+
+def _arrow_array(pyarrow, cls, field, values, types):
+    '''
+    Convert a list of values into an Arrow array.
+
+    ``types`` maps field names to Arrow types. It is used to keep the
+    types of a field consistent between batches and is updated with the
+    type of new fields. Types which have been inferred from values
+    without information (e.g. empty lists) are replaced once values are
+    available, and integer fields are widened if floating point values
+    occur.
+    '''
+    compute = _import('pyarrow.compute')
+    if _is_datetime_field(cls, field):
+        return _arrow_timestamps(pyarrow, values)
+    if _is_date_field(cls, field):
+        strings = pyarrow.array(values, pyarrow.string())
+        return compute.strptime(strings, format='%Y-%m-%d', unit='s',
+                                error_is_null=True).cast(pyarrow.date32())
+    type = types.get(field)
+    if type is None:
+        type = _declared_type(pyarrow, cls, field)
+    try:
+        array = pyarrow.array(values)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        array = None
+    if array is None:
+        merged = None
+    elif type is None:
+        merged = array.type
+    else:
+        merged = _merge_types(pyarrow, type, array.type)
+    if merged is None:
+        if (type is not None and not _is_undetermined(pyarrow, type)
+                and not pyarrow.types.is_string(type)):
+            raise ValueError(('Values of field "{field}" do not match the '
+                             + 'type of the field in previous pages '
+                             + '({type}).').format(field=field, type=type))
+        # Mixed values are stored as strings
+        types[field] = pyarrow.string()
+        return pyarrow.array([v if v is None or isinstance(v, six.text_type)
+                              else json.dumps(v) for v in values],
+                             pyarrow.string())
+    types[field] = merged
+    # Lossy conversions raise an exception
+    return array.cast(merged, safe=True)
+
+
+def iter_record_batches(lst, fields=None):
+    '''
+    Convert an external list into Arrow record batches.
+
+    ``lst`` is an instance of ``ExternalObjectList``. ``fields`` is the
+    list of the names of the fields that are exported, one column per
+    field. By default, all fields found on the list's first page are
+    exported.
+
+    Yields one ``pyarrow.RecordBatch`` per page of the list. The types
+    of fields without a special OParl type are inferred from the values.
+    If a field only contains nulls or empty lists on the first pages, or
+    contains integers first and floating point numbers later, then the
+    field's type in later batches differs from that in earlier batches.
+    ``to_table`` takes care of that.
+    '''
+    pyarrow = _import('pyarrow')
+    types = {}
+    for cls, fields, columns in _iter_columns(lst, fields):
+        arrays = [_arrow_array(pyarrow, cls, field, values, types)
+                  for field, values in zip(fields, columns)]
+        yield pyarrow.RecordBatch.from_arrays(arrays, fields)
+
+
+def to_table(lst, fields=None):
+    '''
+    Convert an external list into an Arrow table.
+
+    See ``iter_record_batches`` for details. The columns of all batches
+    are converted to the types of the last batch, which can hold the
+    values of all previous batches.
+    '''
+    pyarrow = _import('pyarrow')
+    batches = list(iter_record_batches(lst, fields))
+    if not batches:
+        return pyarrow.Table.from_batches(batches)
+    schema = batches[-1].schema
+    batches = [pyarrow.RecordBatch.from_arrays(
+               [column.cast(type, safe=True)
+                for column, type in zip(batch.columns, schema.types)],
+               schema=schema) for batch in batches]
+    return pyarrow.Table.from_batches(batches)
+
+
+def _pandas_datetimes(pandas, values):
+    '''
+    Convert a list of date-time strings into a pandas series.
+    '''
+    if int(pandas.__version__.split('.')[0]) >= 2:
+        return pandas.to_datetime(values, utc=True, errors='coerce',
+                                  format='ISO8601')
+    return pandas.to_datetime(values, utc=True, errors='coerce')
+
+
+def iter_dataframes(lst, fields=None):
+    '''
+    Convert an external list into pandas data frames.
+
+    ``lst`` is an instance of ``ExternalObjectList``. ``fields`` is the
+    list of the names of the fields that are exported, one column per
+    field. By default, all fields found on the list's first page are
+    exported.
+
+    Yields one ``pandas.DataFrame`` per page of the list.
+    '''
+    pandas = _import('pandas')
+    for cls, fields, columns in _iter_columns(lst, fields):
+        data = {}
+        for field, values in zip(fields, columns):
+            if _is_datetime_field(cls, field):
+                series = _pandas_datetimes(pandas, pandas.Series(
+                                           values, dtype=object))
+            elif _is_date_field(cls, field):
+                series = pandas.to_datetime(pandas.Series(values,
+                                            dtype=object), errors='coerce',
+                                            format='%Y-%m-%d')
+            else:
+                series = pandas.Series(values)
+            data[field] = series
+        yield pandas.DataFrame(data, columns=fields)
+
+
+def to_dataframe(lst, fields=None):
+    '''
+    Convert an external list into a pandas data frame.
+
+    See ``iter_dataframes`` for details.
+    '''
+    pandas = _import('pandas')
+    frames = list(iter_dataframes(lst, fields))
+    if not frames:
+        return pandas.DataFrame(columns=fields)
+    return pandas.concat(frames, ignore_index=True)
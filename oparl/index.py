@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+In-memory index of the references between OParl objects.
+
+Links between OParl objects mostly point in one direction: a
+``Membership`` references its ``person`` and its ``organization``, but
+neither of these knows about the membership. The ``Index`` class keeps
+track of these references and allows you to follow them backwards::
+
+    import oparl
+    from oparl.index import Index
+    from oparl.objects import Membership
+
+    oparl.INDEX = Index()
+    body = oparl.from_id('https://example.org/oparl/body/1')
+    for person in body['person']:
+        pass
+    memberships = oparl.INDEX.referrers(some_organization,
+                                        field='organization',
+                                        cls=Membership)
+
+Once an index has been assigned to ``oparl.INDEX`` every object that is
+loaded (via ``from_json``, ``from_id``, ``Object.load`` or during the
+iteration of an external list) is added to it automatically. You can
+also add objects manually using ``Index.add``.
+'''
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import threading
+
+import six
+
+from . import _lazy, Object
+
+
+class Index(object):
+    '''
+    Index of the references between OParl objects.
+
+    The index records the references contained in the fields listed in
+    the ``_REFERENCE_FIELDS`` and ``_REFERENCE_LIST_FIELDS`` attributes
+    of the object classes. Both the references and their reverse
+    direction can be looked up in constant time.
+
+    Internally, OParl IDs, type URIs and field names are mapped to
+    integers. The references of an object are stored in a compact
+    integer array, their reverse direction is stored in a dict per
+    target so that re-indexing an object doesn't depend on the number
+    of references to its targets.
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        # Node number -> OParl ID
+        self._ids = []
+
+        # OParl ID -> node number
+        self._numbers = {}
+
+        # Node number -> name number of the node's type URI (or -1 if
+        # the type is unknown).
+        self._types = array.array('l')
+
+        # Interned type URIs and field names
+        self._names = []
+        self._name_numbers = {}
+
+        # Node number -> array of ``(field, target)`` number pairs
+        self._forward = {}
+
+        # Node number -> dict that maps the numbers of source nodes to
+        # tuples of field numbers
+        self._reverse = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, obj):
+        return _get_id(obj) in self._numbers
+
+    def _intern(self, name):
+        '''
+        Get the number of a type URI or field name.
+        '''
+        try:
+            return self._name_numbers[name]
+        except KeyError:
+            number = self._name_numbers[name] = len(self._names)
+            self._names.append(name)
+            return number
+
+    def _node(self, id, type=None):
+        '''
+        Get the node number of an OParl ID.
+
+        The node is created if it doesn't exist, yet. If ``type`` is
+        given then it is stored as the node's type.
+        '''
+        try:
+            number = self._numbers[id]
+        except KeyError:
+            number = self._numbers[id] = len(self._ids)
+            self._ids.append(id)
+            self._types.append(-1)
+        if type is not None:
+            self._types[number] = self._intern(type)
+        return number
+
+    def add(self, obj):
+        '''
+        Add an object's references to the index.
+
+        If the object has already been indexed then its previously
+        recorded references are replaced.
+        '''
+        cls = obj.__class__
+        edges = array.array('l')
+        with self._lock:
+            source = self._node(obj._data['id'], obj._data['type'])
+            for field in cls._REFERENCE_FIELDS:
+                value = obj._data.get(field)
+                if isinstance(value, Object):
+                    self._add_edge(edges, field, value)
+            for field in cls._REFERENCE_LIST_FIELDS:
+                values = obj._data.get(field)
+                if isinstance(values, list):
+                    for value in values:
+                        if isinstance(value, Object):
+                            self._add_edge(edges, field, value)
+            if self._forward.get(source, array.array('l')) == edges:
+                # References are unchanged (e.g. the object was reloaded)
+                return
+            self._remove_edges(source)
+            if edges:
+                self._forward[source] = edges
+                for k in six.moves.range(0, len(edges), 2):
+                    sources = self._reverse.setdefault(edges[k + 1], {})
+                    sources[source] = sources.get(source, ()) + (edges[k],)
+
+    def _add_edge(self, edges, field, target):
+        target_type = None
+        if not self._type_known(target._data['id']):
+            target_type = target._data['type']
+        edges.extend((self._intern(field),
+                      self._node(target._data['id'], target_type)))
+
+    def _type_known(self, id):
+        number = self._numbers.get(id)
+        return number is not None and self._types[number] != -1
+
+    def _remove_edges(self, source):
+        '''
+        Remove the references recorded for a node.
+        '''
+        edges = self._forward.pop(source, None)
+        if not edges:
+            return
+        for target in set(edges[1::2]):
+            sources = self._reverse[target]
+            del sources[source]
+            if not sources:
+                del self._reverse[target]
+
+    def _iter_forward(self, number):
+        '''
+        Iterate over the ``(field, target)`` number pairs of a node.
+        '''
+        edges = self._forward.get(number, ())
+        for k in six.moves.range(0, len(edges), 2):
+            yield edges[k], edges[k + 1]
+
+    def _iter_reverse(self, number):
+        '''
+        Iterate over the ``(field, source)`` number pairs of a node.
+        '''
+        for source, fields in six.iteritems(self._reverse.get(number, {})):
+            for field in fields:
+                yield field, source
+
+    def _lookup(self, iter_edges, obj, field, cls):
+        number = self._numbers.get(_get_id(obj))
+        if number is None:
+            return []
+        field_number = None
+        if field is not None:
+            field_number = self._name_numbers.get(field)
+            if field_number is None:
+                return []
+        result = []
+        seen = set()
+        for edge_field, other in iter_edges(number):
+            if field_number is not None and edge_field != field_number:
+                continue
+            if other in seen:
+                continue
+            seen.add(other)
+            type_number = self._types[other]
+            if type_number == -1:
+                continue
+            type = self._names[type_number]
+            if cls is not None and type.rsplit('/', 1)[-1] != cls.__name__:
+                continue
+            result.append(_lazy(self._ids[other], type))
+        return result
+
+    def referrers(self, obj, field=None, cls=None):
+        '''
+        Get the objects that reference an object.
+
+        ``obj`` is either an OParl object or an OParl ID. Returns a list
+        of lazy OParl objects which reference ``obj``. If ``field`` is
+        given then only references via that field are considered. If
+        ``cls`` is given then only objects of that class are returned.
+        '''
+        with self._lock:
+            return self._lookup(self._iter_reverse, obj, field, cls)
+
+    def references(self, obj, field=None, cls=None):
+        '''
+        Get the objects referenced by an object.
+
+        ``obj`` is either an OParl object or an OParl ID. Returns a list
+        of lazy OParl objects which are referenced by ``obj``. The
+        ``field`` and ``cls`` arguments work as for ``referrers``.
+        '''
+        with self._lock:
+            return self._lookup(self._iter_forward, obj, field, cls)
+
+
+def _get_id(obj):
+    '''
+    Get the ID of an OParl object or return an ID unchanged.
+    '''
+    if isinstance(obj, Object):
+        return obj._data['id']
+    return obj
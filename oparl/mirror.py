@@ -0,0 +1,577 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+'''
+Local read-only mirror of an OParl server.
+
+This module crawls an OParl server into a local SQLite database and
+serves the stored data as an OParl 1.0 API. The mirror can then be used
+instead of the original server, for example by other users of this
+library, which reduces the load on the original server.
+
+The functionality is available via the ``oparl-mirror`` command::
+
+    oparl-mirror crawl https://oparl.example.org/oparl/system mirror.sqlite
+    oparl-mirror serve mirror.sqlite --port 8000
+
+During crawling, all external object lists (e.g. the papers of a body)
+and all referenced objects are retrieved. Since the library's normal
+download functions are used, ``oparl.CACHE`` and ``oparl.SOURCES`` are
+taken into account.
+
+The mirror maps URLs below the original server's origin (by default its
+scheme and host name, e.g. ``https://oparl.example.org``) to URLs below
+the mirror's base URL. URLs in the served data are rewritten if they
+are IDs of stored objects or URLs of stored lists, other URLs (e.g. the
+download URLs of files) are left unchanged. The root URL of the mirror
+serves the system object. The external object lists are paginated and
+support the ``modified_since``, ``modified_until`` and ``limit``
+parameters of the OParl specification.
+'''
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+import json
+import logging
+
+import six
+from six.moves import BaseHTTPServer, socketserver
+from six.moves.urllib.parse import parse_qsl, urlencode, urlparse
+
+from . import (_class_from_type_uri, _get_json, _parallel_map,
+               _parse_datetime, ExternalObjectList, log, MAX_WORKERS)
+from .sources import SQLiteSource
+
+
+# Default number of objects per page of an external list
+PAGE_SIZE = 100
+
+# Maximum number of objects per page of an external list
+MAX_PAGE_SIZE = 1000
+
+# Query parameters that are handled by the mirror itself
+_LIST_PARAMETERS = ('modified_since', 'modified_until', 'limit', 'after')
+
+
+def _normalize_datetime(value):
+    '''
+    Convert a date-time string into a sortable UTC string.
+
+    Returns ``None`` if the value is not a valid date-time string.
+    '''
+    if not isinstance(value, six.string_types):
+        return None
+    try:
+        dt = _parse_datetime(value)
+    except (ValueError, OverflowError):
+        return None
+    if dt.tzinfo is not None:
+        dt = (dt - dt.utcoffset()).replace(tzinfo=None)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+
+
+class MirrorStore(SQLiteSource):
+    '''
+    Storage for the data of a mirrored OParl server.
+
+    In addition to the objects (see ``SQLiteSource``), the store keeps
+    track of the contents of external object lists, of the URL of the
+    mirrored system object (``system``) and of the URL prefix that is
+    mapped to the mirror (``origin``).
+    '''
+    def __init__(self, filename):
+        super(MirrorStore, self).__init__(filename)
+        with self._connection() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS list_items ('
+                        + 'list TEXT NOT NULL, '
+                        + 'position INTEGER NOT NULL, '
+                        + 'id TEXT NOT NULL, '
+                        + 'modified TEXT, '
+                        + 'PRIMARY KEY (list, position))')
+            con.execute('CREATE TABLE IF NOT EXISTS lists ('
+                        + 'url TEXT PRIMARY KEY)')
+            con.execute('CREATE TABLE IF NOT EXISTS meta ('
+                        + 'key TEXT PRIMARY KEY, value TEXT)')
+
+    def _get_meta(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self._connection() as con:
+            con.execute('INSERT OR REPLACE INTO meta (key, value) '
+                        + 'VALUES (?, ?)', (key, value))
+
+    @property
+    def origin(self):
+        '''
+        URL prefix of the mirrored data.
+        '''
+        return self._get_meta('origin')
+
+    @origin.setter
+    def origin(self, value):
+        self._set_meta('origin', value)
+
+    @property
+    def system(self):
+        '''
+        URL of the mirrored system object.
+        '''
+        return self._get_meta('system')
+
+    @system.setter
+    def system(self, value):
+        self._set_meta('system', value)
+
+    def get_text(self, id):
+        '''
+        Get the stored JSON string of an object.
+
+        Returns ``None`` if the store doesn't contain the ID.
+        '''
+        row = self._connection().execute(
+            'SELECT data FROM objects WHERE id = ?', (id,)).fetchone()
+        return row[0] if row else None
+
+    def set_list(self, url, items):
+        '''
+        Set the contents of an external object list.
+
+        ``url`` is the list's URL and ``items`` is the list of the JSON
+        data of the list's objects. The objects themselves are not
+        stored, use ``add`` for that.
+        '''
+        with self._connection() as con:
+            con.execute('INSERT OR IGNORE INTO lists (url) VALUES (?)',
+                        (url,))
+            con.execute('DELETE FROM list_items WHERE list = ?', (url,))
+            con.executemany('INSERT INTO list_items (list, position, id, '
+                            + 'modified) VALUES (?, ?, ?, ?)',
+                            ((url, position, item['id'],
+                              _normalize_datetime(item.get('modified')))
+                             for position, item in enumerate(items)))
+
+    def known(self, urls):
+        '''
+        Find the stored object IDs and list URLs among some URLs.
+
+        Returns the set of those URLs in ``urls`` that are IDs of stored
+        objects or URLs of stored external object lists.
+        '''
+        urls = list(urls)
+        result = set()
+        con = self._connection()
+        for i in six.moves.range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            marks = ', '.join('?' * len(chunk))
+            for table, column in (('objects', 'id'), ('lists', 'url')):
+                result.update(row[0] for row in con.execute(
+                    'SELECT {column} FROM {table} WHERE {column} IN ({marks})'
+                    .format(column=column, table=table, marks=marks),
+                    chunk))
+        return result
+
+    def is_list(self, url):
+        '''
+        Check if an URL is the URL of a stored external object list.
+        '''
+        return self._connection().execute(
+            'SELECT 1 FROM lists WHERE url = ?',
+            (url,)).fetchone() is not None
+
+    def list_page(self, url, after=-1, limit=PAGE_SIZE, modified_since=None,
+                  modified_until=None):
+        '''
+        Get a page of an external object list.
+
+        Returns a list of tuples ``(position, data)`` for the first
+        ``limit`` objects of the list whose position is larger than
+        ``after``. ``data`` is the object's JSON string.
+        ``modified_since`` and ``modified_until`` are optional date-time
+        strings that restrict the result to objects which have been
+        modified in the given period.
+        '''
+        sql = ('SELECT l.position, o.data FROM list_items l '
+               + 'JOIN objects o ON o.id = l.id '
+               + 'WHERE l.list = ? AND l.position > ?')
+        parameters = [url, after]
+        if modified_since is not None:
+            sql += ' AND l.modified >= ?'
+            parameters.append(_normalize_datetime(modified_since))
+        if modified_until is not None:
+            sql += ' AND l.modified <= ?'
+            parameters.append(_normalize_datetime(modified_until))
+        sql += ' ORDER BY l.position LIMIT ?'
+        parameters.append(limit)
+        return self._connection().execute(sql, parameters).fetchall()
+
+
+def _with_embedded(data):
+    '''
+    Get an object's JSON data and that of its embedded objects.
+
+    Returns a list containing ``data`` and the JSON data of all objects
+    that are (recursively) embedded in it.
+    '''
+    result = [data]
+    try:
+        cls = _class_from_type_uri(data['type'])
+    except (KeyError, ValueError):
+        return result
+    for field in cls._OBJECT_FIELDS + cls._OBJECT_LIST_FIELDS:
+        values = data.get(field)
+        if not isinstance(values, list):
+            values = [values]
+        for value in values:
+            if isinstance(value, dict) and 'id' in value:
+                result.extend(_with_embedded(value))
+    return result
+
+
+def _references(data):
+    '''
+    Get the IDs of the objects referenced by an object.
+    '''
+    try:
+        cls = _class_from_type_uri(data['type'])
+    except (KeyError, ValueError):
+        return
+    for field in cls._REFERENCE_FIELDS:
+        value = data.get(field)
+        if isinstance(value, six.string_types):
+            yield value
+    for field in cls._REFERENCE_LIST_FIELDS:
+        values = data.get(field)
+        if isinstance(values, list):
+            for value in values:
+                if isinstance(value, six.string_types):
+                    yield value
+
+
+def _default_origin(url):
+    '''
+    Get the scheme and host name of an URL.
+    '''
+    parts = urlparse(url)
+    return '{scheme}://{netloc}'.format(scheme=parts.scheme,
+                                        netloc=parts.netloc)
+
+
+def crawl(url, store, references=True, max_workers=None, origin=None):
+    '''
+    Crawl an OParl server into a ``MirrorStore``.
+
+    ``url`` is the URL of the server's system object. The system object,
+    the contents of all external object lists and all embedded objects
+    are stored. If ``references`` is true then objects which are only
+    referenced (but not contained in any list) are downloaded, too,
+    using up to ``max_workers`` threads (``MAX_WORKERS`` by default).
+
+    ``origin`` is the URL prefix that is mapped to the mirror's base URL
+    when the data is served. By default, the scheme and host name of
+    ``url`` are used.
+    '''
+    store.system = url
+    store.origin = (origin or _default_origin(url)).rstrip('/')
+    seen = set()
+    referenced = set()
+
+    def add(objects):
+        store.add(objects)
+        for data in objects:
+            seen.add(data['id'])
+            referenced.update(_references(data))
+
+    root = _get_json(url)
+    add(_with_embedded(root))
+    # Objects whose external object lists still have to be crawled
+    pending = [root]
+    crawled_lists = set()
+    while pending:
+        data = pending.pop()
+        try:
+            cls = _class_from_type_uri(data['type'])
+        except (KeyError, ValueError):
+            continue
+        for field in cls._EXTERNAL_LIST_FIELDS:
+            list_url = data.get(field)
+            if not isinstance(list_url, six.string_types):
+                continue
+            if list_url in crawled_lists:
+                continue
+            crawled_lists.add(list_url)
+            log.info('Crawling list {url}'.format(url=list_url))
+            items = []
+            for page in ExternalObjectList(list_url)._iter_raw_pages():
+                for item in page:
+                    add(_with_embedded(item))
+                    items.append(item)
+                    pending.append(item)
+            store.set_list(list_url, items)
+    while references:
+        missing = sorted(referenced - seen)
+        if not missing:
+            break
+        log.info('Downloading {count} referenced objects'.format(
+                 count=len(missing)))
+
+        def download(id):
+            try:
+                return _get_json(id)
+            except Exception as e:
+                log.warning('Could not download {id}: {error}'.format(
+                            id=id, error=e))
+
+        results = _parallel_map(download, missing, max_workers or MAX_WORKERS)
+        seen.update(missing)
+        for data in results:
+            if data is not None:
+                add(_with_embedded(data))
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    '''
+    HTTP request handler for the mirror.
+
+    The mirror's configuration is taken from the server instance.
+    '''
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        log.debug(format % args)
+
+    def _send(self, status, body):
+        body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({'error': message}))
+
+    def do_GET(self):
+        server = self.server
+        path, _, query = self.path.partition('?')
+        base_path = server.base_path
+        if base_path:
+            if path != base_path and not path.startswith(base_path + '/'):
+                return self._send_error(404, 'Not found.')
+            path = path[len(base_path):]
+        parameters = parse_qsl(query, keep_blank_values=True)
+        list_parameters = dict((k, v) for k, v in parameters
+                               if k in _LIST_PARAMETERS)
+        other = [(k, v) for k, v in parameters if k not in _LIST_PARAMETERS]
+        store = server.store
+        if not path.strip('/') and not other:
+            url = store.system
+        else:
+            url = server.origin + path.rstrip('/')
+            if other:
+                url += '?' + urlencode(other)
+        if store.is_list(url):
+            return self._send_list(url, list_parameters)
+        text = store.get_text(url)
+        if text is None and not other:
+            text = store.get_text(url + '/')
+        if text is None:
+            return self._send_error(404, 'Not found.')
+        self._send(200, json.dumps(server.rewrite(json.loads(text))))
+
+    def _send_list(self, url, parameters):
+        server = self.server
+        try:
+            limit = min(int(parameters.get('limit', PAGE_SIZE)),
+                        MAX_PAGE_SIZE)
+            after = int(parameters.get('after', -1))
+        except ValueError:
+            return self._send_error(400, 'Invalid parameter.')
+        for key in ('modified_since', 'modified_until'):
+            if (key in parameters
+                    and _normalize_datetime(parameters[key]) is None):
+                return self._send_error(400, 'Invalid date-time in '
+                                        + '"{key}".'.format(key=key))
+        rows = server.store.list_page(
+            url, after, limit, parameters.get('modified_since'),
+            parameters.get('modified_until'))
+        links = {}
+        if len(rows) == limit:
+            next_parameters = dict(parameters)
+            next_parameters['after'] = rows[-1][0]
+            next_url = server.mirror_url(url)
+            links['next'] = '{url}{sep}{query}'.format(
+                url=next_url, sep='&' if '?' in next_url else '?',
+                query=urlencode(sorted(next_parameters.items())))
+        data = server.rewrite([json.loads(row[1]) for row in rows])
+        self._send(200, json.dumps({
+            'data': data,
+            'pagination': {'elementsPerPage': limit},
+            'links': links,
+        }))
+
+
+class MirrorServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    '''
+    HTTP server that serves the contents of a ``MirrorStore``.
+
+    ``address`` is a tuple ``(host, port)``. ``base_url`` is the public
+    URL of the mirror, by default it is derived from ``address``.
+    ``origin`` is the URL prefix that is mapped to ``base_url``, by
+    default the store's ``origin`` is used. Object IDs and list URLs in
+    the served data are rewritten accordingly.
+    '''
+    daemon_threads = True
+
+    def __init__(self, address, store, base_url=None, origin=None):
+        BaseHTTPServer.HTTPServer.__init__(self, address, _Handler)
+        self.store = store
+        self.origin = (origin or store.origin).rstrip('/')
+        if base_url is None:
+            base_url = 'http://{host}:{port}'.format(
+                host=self.server_address[0], port=self.server_address[1])
+        self.base_url = base_url.rstrip('/')
+        # Path under which the mirror is served, e.g. behind a proxy
+        self.base_path = urlparse(self.base_url).path
+
+    def mirror_url(self, url):
+        '''
+        Get the mirror's URL for an URL below the origin.
+
+        Other URLs are returned unchanged.
+        '''
+        if url == self.origin or url.startswith((self.origin + '/',
+                                                 self.origin + '?')):
+            return self.base_url + url[len(self.origin):]
+        return url
+
+    def rewrite(self, data):
+        '''
+        Rewrite the URLs in JSON data to point to the mirror.
+
+        Only strings which are IDs of stored objects or URLs of stored
+        lists are rewritten. Returns the rewritten data.
+        '''
+        urls = set(value for value in _iter_strings(data)
+                   if self.mirror_url(value) != value)
+        mapping = dict((url, self.mirror_url(url))
+                       for url in self.store.known(urls))
+        return _replace_strings(data, mapping)
+
+
+def _iter_strings(value):
+    '''
+    Iterate over the strings contained in JSON data.
+    '''
+    if isinstance(value, six.string_types):
+        yield value
+    elif isinstance(value, dict):
+        for v in six.itervalues(value):
+            for s in _iter_strings(v):
+                yield s
+    elif isinstance(value, list):
+        for v in value:
+            for s in _iter_strings(v):
+                yield s
+
+
+def _replace_strings(value, mapping):
+    '''
+    Replace the strings in JSON data according to a mapping.
+    '''
+    if isinstance(value, six.string_types):
+        return mapping.get(value, value)
+    if isinstance(value, dict):
+        return dict((k, _replace_strings(v, mapping))
+                    for k, v in six.iteritems(value))
+    if isinstance(value, list):
+        return [_replace_strings(v, mapping) for v in value]
+    return value
+
+
+def main(args=None):
+    '''
+    Entry point of the ``oparl-mirror`` command.
+    '''
+    parser = argparse.ArgumentParser(
+        description='Local read-only mirror of an OParl server.')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='show progress information')
+    subparsers = parser.add_subparsers(dest='command')
+    crawl_parser = subparsers.add_parser(
+        'crawl', help='download the data of an OParl server')
+    crawl_parser.add_argument('url', help='URL of the OParl system object')
+    crawl_parser.add_argument('database', help='SQLite database file')
+    crawl_parser.add_argument('--no-references', action='store_true',
+                              help='do not download referenced objects '
+                              + 'that are not contained in any list')
+    crawl_parser.add_argument('--origin',
+                              help='URL prefix that is mapped to the '
+                              + 'mirror (default: scheme and host of URL)')
+    serve_parser = subparsers.add_parser(
+        'serve', help='serve a crawled OParl server')
+    serve_parser.add_argument('database', help='SQLite database file')
+    serve_parser.add_argument('--host', default='localhost',
+                              help='host name or address to listen on')
+    serve_parser.add_argument('--port', type=int, default=8000,
+                              help='port to listen on')
+    serve_parser.add_argument('--base-url',
+                              help='public URL of the mirror')
+    serve_parser.add_argument('--origin',
+                              help='URL prefix that is mapped to the '
+                              + 'mirror (default: from the crawl)')
+    args = parser.parse_args(args)
+    if args.verbose:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+    if args.command == 'crawl':
+        crawl(args.url, MirrorStore(args.database),
+              references=not args.no_references, origin=args.origin)
+    elif args.command == 'serve':
+        store = MirrorStore(args.database)
+        if store.origin is None:
+            parser.error('The database does not contain a crawled server.')
+        server = MirrorServer((args.host, args.port), store, args.base_url,
+                              args.origin)
+        print('Serving {origin} at {url}'.format(origin=server.origin,
+                                                 url=server.base_url))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    else:
+        parser.print_help()
+        return 2
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -24,7 +24,7 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
-from . import Object
+from . import _download, _parallel_map, Object
 
 
 class AgendaItem(Object):
@@ -75,6 +75,48 @@ class File(Object):
         'paper': 'https://schema.oparl.org/1.0/Paper',
     }
 
+    def download(self, filename, resume=True, verify=True, chunk_size=None):
+        '''
+        Download the file's content.
+
+        The content is streamed from the file's ``downloadUrl`` (or its
+        ``accessUrl`` if there is no download URL) into the local file
+        ``filename``. Interrupted downloads are resumed if ``resume`` is
+        true.
+
+        If ``verify`` is true and the file has a ``sha1Checksum`` then
+        the checksum of the content is verified during the download and
+        a ``ChecksumError`` is raised if it doesn't match.
+        '''
+        url = self.get('downloadUrl') or self['accessUrl']
+        _download(url, filename,
+                  sha1=self.get('sha1Checksum') if verify else None,
+                  size=self.get('size'), resume=resume,
+                  chunk_size=chunk_size)
+
+
+def download_files(downloads, max_workers=4, **kwargs):
+    '''
+    Download the contents of multiple files in parallel.
+
+    ``downloads`` is an iterable of ``(file, filename)`` pairs, where
+    ``file`` is an instance of ``File`` and ``filename`` is the local
+    file name. At most ``max_workers`` downloads are run at the same
+    time. Additional keyword arguments are passed on to
+    ``File.download``.
+
+    Returns a list which contains the exception raised for each
+    download or ``None`` if the download was successful.
+    '''
+    def download(item):
+        file, filename = item
+        try:
+            file.download(filename, **kwargs)
+        except Exception as e:
+            return e
+
+    return _parallel_map(download, downloads, max_workers)
+
 
 class LegislativeTerm(Object):
     _DATE_FIELDS = ['startDate', 'endDate']
@@ -157,3 +199,8 @@ class System(Object):
     }
     _EXTERNAL_LIST_FIELDS = ['body']
 
+
+# Maps OParl type names to the corresponding classes
+_CLASSES = dict((cls.__name__, cls) for cls in [
+    AgendaItem, Body, Consultation, File, LegislativeTerm, Location, Meeting,
+    Membership, Organization, Paper, Person, System])
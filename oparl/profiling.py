@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+'''
+Profiling of the conversion of OParl JSON data.
+
+When profiling is enabled, the time that is spent converting JSON data
+into ``Object`` instances is recorded per class, field and converter
+kind (``'date'``, ``'object_list'``, etc., see
+``Object._field_kinds``). In addition, the time for initializing
+objects from JSON is recorded per class (kind ``'from_json'``). This
+includes the objects that ``from_json_many`` converts in batches, e.g.
+those on the pages of external lists.
+
+Times are inclusive, i.e. the time for converting the embedded objects
+of a field is also counted for that field. The ``own`` time of an entry
+excludes the time of nested entries.
+
+Profiling is disabled by default and has no overhead in that case::
+
+    from oparl import profiling
+
+    with profiling.profile():
+        body = oparl.from_id(url)
+        meetings = list(body['meeting'])
+    print(profiling.report(limit=20))
+
+``collapsed`` returns the results in the "collapsed stack" format that
+is understood by flame graph tools like ``flamegraph.pl`` and
+speedscope.
+'''
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import contextlib
+import threading
+from timeit import default_timer as _timer
+
+import oparl
+from . import Object
+
+
+class Entry(collections.namedtuple('Entry', ['cls', 'field', 'kind',
+                                             'calls', 'total', 'own'])):
+    '''
+    Profiling results for a class, field and converter kind.
+
+    ``cls`` is the class name and ``field`` is the field name (``None``
+    for the ``'from_json'`` and ``'from_json_many'`` kinds). ``calls``
+    is the number of converted values, ``total`` and ``own`` are the
+    inclusive and exclusive times in seconds.
+    '''
+    __slots__ = ()
+
+
+_lock = threading.Lock()
+_local = threading.local()
+
+# Maps call paths (tuples of frame keys) to ``[calls, total, children]``
+# where ``children`` is the time spent in nested frames.
+_records = {}
+
+# Original functions while profiling is enabled
+_originals = {}
+
+
+def _call(key, count, func, args):
+    '''
+    Call a function and record its runtime for a frame key.
+
+    ``key`` is a tuple ``(class name, field, kind)`` and ``count`` is
+    the number of values that the call converts.
+    '''
+    try:
+        stack = _local.stack
+    except AttributeError:
+        stack = _local.stack = []
+    frame = [key, 0.0]
+    stack.append(frame)
+    start = _timer()
+    try:
+        return func(*args)
+    finally:
+        elapsed = _timer() - start
+        stack.pop()
+        if stack:
+            stack[-1][1] += elapsed
+        path = tuple(f[0] for f in stack) + (key,)
+        with _lock:
+            record = _records.get(path)
+            if record is None:
+                record = _records[path] = [0, 0.0, 0.0]
+            record[0] += count
+            record[1] += elapsed
+            record[2] += frame[1]
+
+
+def _convert_value(self, field, value):
+    original = _originals['_convert_value']
+    kind = self._field_kinds().get(field)
+    if kind is None:
+        return original(self, field, value)
+    return _call((self.__class__.__name__, field, kind), 1, original,
+                 (self, field, value))
+
+
+def _init_from_json(self, data):
+    return _call((self.__class__.__name__, None, 'from_json'), 1,
+                 _originals['_init_from_json'], (self, data))
+
+
+def _convert_many(cls, field, kind, objects, values):
+    return _call((cls.__name__, field, kind), len(values),
+                 _originals['_convert_many'],
+                 (cls, field, kind, objects, values))
+
+
+def from_json_many(data):
+    return _call((None, None, 'from_json_many'), 1,
+                 _originals['from_json_many'], (data,))
+
+
+def _convert_group(cls, type, data):
+    return _call((cls.__name__, None, 'from_json'), len(data),
+                 _originals['_convert_group'], (cls, type, data))
+
+
+def enable():
+    '''
+    Enable profiling.
+
+    Results are accumulated until ``reset`` is called.
+    '''
+    with _lock:
+        if _originals:
+            return
+        for name in ('_convert_value', '_init_from_json'):
+            _originals[name] = Object.__dict__[name]
+            setattr(Object, name, globals()[name])
+        for name in ('_convert_many', '_convert_group', 'from_json_many'):
+            _originals[name] = getattr(oparl, name)
+            setattr(oparl, name, globals()[name])
+
+
+def disable():
+    '''
+    Disable profiling.
+
+    The results recorded so far are kept.
+    '''
+    with _lock:
+        for name in ('_convert_value', '_init_from_json'):
+            if name in _originals:
+                setattr(Object, name, _originals[name])
+        for name in ('_convert_many', '_convert_group', 'from_json_many'):
+            if name in _originals:
+                setattr(oparl, name, _originals[name])
+        _originals.clear()
+
+
+def reset():
+    '''
+    Discard all recorded results.
+    '''
+    with _lock:
+        _records.clear()
+
+
+@contextlib.contextmanager
+def profile():
+    '''
+    Context manager that enables profiling for its body.
+    '''
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+
+
+def results(sort='total'):
+    '''
+    Get the profiling results.
+
+    Returns a list of ``Entry`` instances, one for each combination of
+    class, field and kind. The list is sorted in descending order by the
+    entry attribute given in ``sort`` (``'total'``, ``'own'`` or
+    ``'calls'``).
+    '''
+    if sort not in ('total', 'own', 'calls'):
+        raise ValueError('Invalid sort key "{}".'.format(sort))
+    with _lock:
+        records = list(_records.items())
+    entries = {}
+    for path, (calls, total, children) in records:
+        key = path[-1]
+        entry = entries.get(key)
+        if entry is None:
+            entry = entries[key] = [0, 0.0, 0.0]
+        entry[0] += calls
+        # Recursive frames are only counted once in the total time
+        if key not in path[:-1]:
+            entry[1] += total
+        entry[2] += total - children
+    entries = [Entry(*(key + tuple(values)))
+               for key, values in entries.items()]
+    entries.sort(key=lambda entry: getattr(entry, sort), reverse=True)
+    return entries
+
+
+def _label(key):
+    cls, field, kind = key
+    if field is not None:
+        return '{cls}.{field} ({kind})'.format(cls=cls, field=field,
+                                               kind=kind)
+    if cls is not None:
+        return '{cls} ({kind})'.format(cls=cls, kind=kind)
+    return kind
+
+
+def report(sort='total', limit=None):
+    '''
+    Format the profiling results as a table.
+
+    ``sort`` is passed on to ``results``. If ``limit`` is given then
+    only the first ``limit`` entries are included.
+    '''
+    lines = ['{:>10} {:>10} {:>10}  {}'.format('total [s]', 'own [s]',
+                                                'calls', 'converter')]
+    for entry in results(sort)[:limit]:
+        lines.append('{:>10.4f} {:>10.4f} {:>10}  {}'.format(
+                     entry.total, entry.own, entry.calls,
+                     _label(entry[:3])))
+    return '\n'.join(lines)
+
+
+def collapsed():
+    '''
+    Format the profiling results as collapsed stacks.
+
+    Each line contains a call path (with frames separated by ``;``) and
+    the own time of the path's last frame in microseconds. This format
+    can be converted into a flame graph using ``flamegraph.pl`` or
+    speedscope.
+    '''
+    with _lock:
+        records = list(_records.items())
+    lines = []
+    for path, (_, total, children) in records:
+        microseconds = int(round((total - children) * 1e6))
+        if microseconds > 0:
+            lines.append('{path} {time}'.format(
+                         path=';'.join(_label(key) for key in path),
+                         time=microseconds))
+    lines.sort()
+    return '\n'.join(lines)
@@ -0,0 +1,381 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+'''
+Local full-text search for OParl objects.
+
+OParl doesn't offer a search interface. This module provides an
+inverted index that is stored in an SQLite database and that can be
+filled with OParl objects (e.g. during a crawl or from a crawl's
+output)::
+
+    from oparl.search import SearchIndex
+
+    index = SearchIndex('/path/to/index.sqlite')
+    index.update(body['paper'])
+    for paper in index.search('"neues Rathaus" Haushalt'):
+        print(paper['name'])
+
+By default, the ``name`` and ``reference`` fields of papers, the
+``name`` of meetings and the ``name``, ``fileName`` and ``text`` fields
+of files are indexed. Objects whose ``modified`` field hasn't changed
+since they were indexed are skipped when the index is updated, and
+objects marked as ``deleted`` are removed from the index.
+
+Queries consist of keywords and of phrases in double quotes. Only
+objects which contain all keywords and phrases are returned, ranked
+using the BM25 scoring function.
+'''
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import datetime
+import json
+import math
+import re
+import sqlite3
+import threading
+
+import six
+
+from . import _lazy, Object
+
+
+# Fields that are indexed by default, by type name
+DEFAULT_FIELDS = {
+    'File': ['name', 'fileName', 'text'],
+    'Meeting': ['name'],
+    'Paper': ['name', 'reference'],
+}
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+_QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)', re.UNICODE)
+
+
+def _tokenize(text):
+    '''
+    Split a text into lower-case tokens.
+    '''
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _parse_query(query):
+    '''
+    Parse a search query.
+
+    Returns a list of phrases, each of which is a list of tokens. Single
+    keywords are returned as phrases of length one.
+    '''
+    phrases = []
+    for phrase, keyword in _QUERY_PATTERN.findall(query):
+        tokens = _tokenize(phrase or keyword)
+        if tokens:
+            phrases.append(tokens)
+    return phrases
+
+
+def _raw(obj):
+    '''
+    Get the JSON data of an object.
+
+    ``obj`` is either an ``Object`` instance or OParl JSON data (parsed
+    or as a string).
+    '''
+    if isinstance(obj, Object):
+        obj.load()
+        data = dict(obj._data)
+        modified = data.get('modified')
+        if isinstance(modified, datetime.datetime):
+            data['modified'] = modified.isoformat()
+        return data
+    if isinstance(obj, six.binary_type):
+        obj = obj.decode('utf-8')
+    if isinstance(obj, six.string_types):
+        return json.loads(obj)
+    return obj
+
+
+def _contains_phrase(positions, phrase):
+    '''
+    Check if a document contains a phrase.
+
+    ``positions`` maps the phrase's tokens to the sets of their
+    positions in the document.
+    '''
+    return any(all(start + k in positions[token]
+                   for k, token in enumerate(phrase[1:], 1))
+               for start in positions[phrase[0]])
+
+
+class SearchIndex(object):
+    '''
+    Full-text index for OParl objects.
+
+    The index is stored in the SQLite database ``filename``, which is
+    created if it doesn't exist. ``fields`` maps OParl type names (e.g.
+    ``'Paper'``) to the lists of fields that are indexed for objects of
+    that type. Objects of other types are ignored. By default,
+    ``DEFAULT_FIELDS`` is used.
+    '''
+    def __init__(self, filename, fields=None):
+        self.filename = filename
+        self.fields = DEFAULT_FIELDS if fields is None else fields
+        self._local = threading.local()
+        with self._connection() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS documents ('
+                        + 'doc INTEGER PRIMARY KEY, '
+                        + 'id TEXT UNIQUE NOT NULL, '
+                        + 'type TEXT NOT NULL, '
+                        + 'modified TEXT, '
+                        + 'length INTEGER NOT NULL)')
+            # The postings only contain the term frequencies so that
+            # they can be scanned quickly. The positions of the terms
+            # are only needed for phrase queries and are stored
+            # separately.
+            con.execute('CREATE TABLE IF NOT EXISTS postings ('
+                        + 'term TEXT NOT NULL, '
+                        + 'doc INTEGER NOT NULL, '
+                        + 'frequency INTEGER NOT NULL, '
+                        + 'PRIMARY KEY (term, doc)) WITHOUT ROWID')
+            con.execute('CREATE INDEX IF NOT EXISTS postings_doc '
+                        + 'ON postings (doc)')
+            con.execute('CREATE TABLE IF NOT EXISTS positions ('
+                        + 'doc INTEGER NOT NULL, '
+                        + 'term TEXT NOT NULL, '
+                        + 'positions TEXT NOT NULL, '
+                        + 'PRIMARY KEY (doc, term)) WITHOUT ROWID')
+            # Number of documents and sum of their lengths, kept up to
+            # date by triggers so that they don't have to be computed
+            # for each query.
+            con.execute('CREATE TABLE IF NOT EXISTS totals ('
+                        + 'documents INTEGER NOT NULL, '
+                        + 'length INTEGER NOT NULL)')
+            if con.execute('SELECT COUNT(*) FROM totals').fetchone()[0] == 0:
+                con.execute('INSERT INTO totals SELECT COUNT(*), '
+                            + 'COALESCE(SUM(length), 0) FROM documents')
+            con.execute('CREATE TRIGGER IF NOT EXISTS documents_insert '
+                        + 'AFTER INSERT ON documents BEGIN '
+                        + 'UPDATE totals SET documents = documents + 1, '
+                        + 'length = length + new.length; END')
+            con.execute('CREATE TRIGGER IF NOT EXISTS documents_delete '
+                        + 'AFTER DELETE ON documents BEGIN '
+                        + 'UPDATE totals SET documents = documents - 1, '
+                        + 'length = length - old.length; END')
+
+    def _connection(self):
+        '''
+        Get the database connection for the current thread.
+        '''
+        try:
+            return self._local.connection
+        except AttributeError:
+            con = self._local.connection = sqlite3.connect(self.filename)
+            return con
+
+    def __len__(self):
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    def _remove(self, con, id):
+        row = con.execute('SELECT doc FROM documents WHERE id = ?',
+                          (id,)).fetchone()
+        if row is None:
+            return False
+        con.execute('DELETE FROM postings WHERE doc = ?', row)
+        con.execute('DELETE FROM positions WHERE doc = ?', row)
+        con.execute('DELETE FROM documents WHERE doc = ?', row)
+        return True
+
+    def _add(self, con, data):
+        '''
+        Add an object to the index.
+
+        Returns true if the index was changed.
+        '''
+        id = data['id']
+        type = data['type']
+        fields = self.fields.get(type.rsplit('/', 1)[-1])
+        if fields is None:
+            return False
+        if data.get('deleted'):
+            return self._remove(con, id)
+        modified = data.get('modified')
+        if modified is not None:
+            row = con.execute('SELECT modified FROM documents WHERE id = ?',
+                              (id,)).fetchone()
+            if row is not None and row[0] == modified:
+                return False
+        self._remove(con, id)
+        positions = collections.defaultdict(list)
+        position = 0
+        for field in fields:
+            value = data.get(field)
+            if not isinstance(value, six.string_types):
+                continue
+            for token in _tokenize(value):
+                positions[token].append(position)
+                position += 1
+            # Gap between fields so that phrases don't span fields
+            position += 1
+        doc = con.execute('INSERT INTO documents (id, type, modified, length) '
+                          + 'VALUES (?, ?, ?, ?)',
+                          (id, type, modified, position)).lastrowid
+        con.executemany('INSERT INTO postings (term, doc, frequency) '
+                        + 'VALUES (?, ?, ?)',
+                        ((token, doc, len(ps))
+                         for token, ps in six.iteritems(positions)))
+        con.executemany('INSERT INTO positions (doc, term, positions) '
+                        + 'VALUES (?, ?, ?)',
+                        ((doc, token, ' '.join(str(p) for p in ps))
+                         for token, ps in six.iteritems(positions)))
+        return True
+
+    def update(self, objects):
+        '''
+        Add objects to the index.
+
+        ``objects`` is an iterable of ``Object`` instances or of OParl
+        JSON data (parsed or as strings, e.g. the lines of a JSONL
+        file). Objects which have already been indexed are re-indexed
+        unless their ``modified`` field is unchanged. Objects which are
+        marked as ``deleted`` are removed from the index.
+
+        Returns the number of changed objects.
+        '''
+        count = 0
+        with self._connection() as con:
+            for obj in objects:
+                if (isinstance(obj, (six.string_types, six.binary_type))
+                        and not obj.strip()):
+                    continue
+                if self._add(con, _raw(obj)):
+                    count += 1
+        return count
+
+    def add(self, obj):
+        '''
+        Add a single object to the index.
+
+        See ``update`` for details.
+        '''
+        return self.update([obj]) > 0
+
+    def remove(self, id):
+        '''
+        Remove an object from the index.
+
+        Returns true if the object was contained in the index.
+        '''
+        with self._connection() as con:
+            return self._remove(con, id)
+
+    def search(self, query, limit=10):
+        '''
+        Search the index.
+
+        Returns a list of at most ``limit`` lazy OParl objects which
+        contain all keywords and phrases from ``query``, ordered by
+        relevance.
+        '''
+        phrases = _parse_query(query)
+        if not phrases:
+            return []
+        tokens = set(token for phrase in phrases for token in phrase)
+        con = self._connection()
+        num_docs, total_length = con.execute(
+            'SELECT documents, length FROM totals').fetchone()
+        if not num_docs:
+            return []
+        dfs = {}
+        for token in tokens:
+            dfs[token] = con.execute(
+                'SELECT COUNT(*) FROM postings WHERE term = ?',
+                (token,)).fetchone()[0]
+            if not dfs[token]:
+                return []
+        # The candidates are the postings of the rarest token which are
+        # joined with the postings of the other tokens. The BM25 score is
+        # computed by SQLite.
+        tokens = sorted(tokens, key=lambda token: (dfs[token], token))
+        joins = []
+        terms = []
+        parameters = []
+        norm = '(? * (1 - ? + ? * d.length / ?))'
+        norm_parameters = [_K1, _B, _B, total_length / num_docs]
+        for k, token in enumerate(tokens):
+            if k:
+                joins.append(('JOIN postings p{k} ON p{k}.term = ? '
+                              + 'AND p{k}.doc = p0.doc').format(k=k))
+            terms.append('? * p{k}.frequency * ? / (p{k}.frequency + {norm})'
+                         .format(k=k, norm=norm))
+            df = dfs[token]
+            parameters.extend([math.log(1 + (num_docs - df + 0.5)
+                                        / (df + 0.5)), _K1 + 1]
+                              + norm_parameters)
+        sql = ('SELECT d.doc, d.id, d.type, {score} AS score '
+               + 'FROM postings p0 {joins} '
+               + 'JOIN documents d ON d.doc = p0.doc '
+               + 'WHERE p0.term = ? ORDER BY score DESC, d.id').format(
+               score=' + '.join(terms), joins=' '.join(joins))
+        parameters = parameters + tokens[1:] + tokens[:1]
+        long_phrases = [phrase for phrase in phrases if len(phrase) > 1]
+        if not long_phrases:
+            rows = con.execute(sql + ' LIMIT ?', parameters + [limit])
+            return [_lazy(id, type) for _, id, type, _ in rows]
+        # Candidates are checked for the phrases in the order of their
+        # scores until enough results have been found. Positions are
+        # only decoded for these checks.
+        phrase_tokens = sorted(set(token for phrase in long_phrases
+                                   for token in phrase))
+        positions_sql = ('SELECT term, positions FROM positions '
+                         + 'WHERE doc = ? AND term IN ({terms})').format(
+                         terms=', '.join('?' * len(phrase_tokens)))
+        result = []
+        for doc, id, type, _ in con.cursor().execute(sql, parameters):
+            positions = dict(
+                (term, set(int(p) for p in ps.split()))
+                for term, ps in con.execute(positions_sql,
+                                            [doc] + phrase_tokens))
+            if all(_contains_phrase(positions, phrase)
+                   for phrase in long_phrases):
+                result.append(_lazy(id, type))
+                if len(result) >= limit:
+                    break
+        return result
+
+    def close(self):
+        '''
+        Close the database connection of the current thread.
+        '''
+        con = getattr(self._local, 'connection', None)
+        if con is not None:
+            con.close()
+            del self._local.connection
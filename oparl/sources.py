@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+'''
+Local sources of OParl data.
+
+If you have a local copy of an OParl server's data (for example a dump
+published by the server or the output of a previous crawl) then you can
+register it as a source. Objects are then loaded from the source
+instead of the network::
+
+    import oparl
+    from oparl.sources import JSONLSource
+
+    oparl.SOURCES.append(JSONLSource('/path/to/dump'))
+    body = oparl.from_id('https://example.org/oparl/body/1')
+
+The sources in ``oparl.SOURCES`` are consulted in order. Data which is
+not contained in any of them is downloaded as usual.
+
+A source is an object with a ``get`` method which takes an URL and
+returns the corresponding parsed JSON data or ``None``.
+'''
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import json
+import mmap
+import os
+import sqlite3
+import threading
+
+import six
+
+
+def _jsonl_filenames(path):
+    '''
+    Get the names of the JSONL files in a directory.
+
+    If ``path`` is a file then it is returned as the only file name.
+    '''
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path)
+                      if name.endswith('.jsonl'))
+    return [path]
+
+
+def _iter_jsonl(filename):
+    '''
+    Iterate over the lines of a JSONL file.
+
+    Yields tuples ``(offset, line)`` where ``offset`` is the position of
+    the line in the file and ``line`` is the (undecoded) line. Empty
+    lines are skipped.
+    '''
+    offset = 0
+    with io.open(filename, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield offset, line
+            offset += len(line)
+
+
+class JSONLSource(object):
+    '''
+    Source that reads OParl data from JSONL files.
+
+    ``paths`` is the name of a JSONL file or of a directory containing
+    JSONL files (files ending in ``.jsonl``), or a list of such names.
+    Each line of a file must contain a single OParl object.
+
+    When the source is created, the files are scanned once to build an
+    index of the position of each object. The files are then memory-
+    mapped so that objects can be retrieved without reading the whole
+    file.
+    '''
+    def __init__(self, paths):
+        if isinstance(paths, six.string_types):
+            paths = [paths]
+        self.filenames = []
+        for path in paths:
+            self.filenames.extend(_jsonl_filenames(path))
+        self._maps = []
+        # OParl ID -> (file number, offset, length)
+        self._positions = {}
+        for i, filename in enumerate(self.filenames):
+            for offset, line in _iter_jsonl(filename):
+                id = json.loads(line.decode('utf-8'))['id']
+                self._positions[id] = (i, offset, len(line))
+            with io.open(filename, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    self._maps.append(mmap.mmap(f.fileno(), 0,
+                                                access=mmap.ACCESS_READ))
+                else:
+                    self._maps.append(b'')
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, id):
+        return id in self._positions
+
+    def get(self, id):
+        '''
+        Get the parsed JSON data for an ID.
+
+        Returns ``None`` if the source doesn't contain the ID.
+        '''
+        try:
+            i, offset, length = self._positions[id]
+        except KeyError:
+            return None
+        return json.loads(self._maps[i][offset:offset + length].decode(
+                          'utf-8'))
+
+    def close(self):
+        '''
+        Close the memory-maps of the JSONL files.
+        '''
+        for m in self._maps:
+            if m:
+                m.close()
+        self._maps = []
+
+
+class SQLiteSource(object):
+    '''
+    Source that stores OParl data in an SQLite database.
+
+    The database is created if it doesn't exist. Objects are stored in
+    their JSON representation and are indexed by their ID. Use ``add``
+    and ``add_jsonl`` to fill the database.
+    '''
+    def __init__(self, filename):
+        self.filename = filename
+        self._local = threading.local()
+        with self._connection() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS objects ('
+                        + 'id TEXT PRIMARY KEY, data TEXT NOT NULL)')
+
+    def _connection(self):
+        '''
+        Get the database connection for the current thread.
+        '''
+        try:
+            return self._local.connection
+        except AttributeError:
+            con = self._local.connection = sqlite3.connect(self.filename)
+            return con
+
+    def __len__(self):
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM objects').fetchone()[0]
+
+    def __contains__(self, id):
+        return self._connection().execute(
+            'SELECT 1 FROM objects WHERE id = ?', (id,)).fetchone() is not None
+
+    def get(self, id):
+        '''
+        Get the parsed JSON data for an ID.
+
+        Returns ``None`` if the source doesn't contain the ID.
+        '''
+        row = self._connection().execute(
+            'SELECT data FROM objects WHERE id = ?', (id,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def add(self, data):
+        '''
+        Add objects to the database.
+
+        ``data`` is an iterable of OParl JSON objects (either parsed or
+        as strings). Existing objects with the same IDs are replaced.
+        '''
+        def rows():
+            for d in data:
+                if isinstance(d, six.binary_type):
+                    d = d.decode('utf-8')
+                if isinstance(d, six.string_types):
+                    text = d.strip()
+                    d = json.loads(text)
+                else:
+                    text = json.dumps(d)
+                yield d['id'], text
+
+        with self._connection() as con:
+            con.executemany('INSERT OR REPLACE INTO objects (id, data) '
+                            + 'VALUES (?, ?)', rows())
+
+    def add_jsonl(self, path):
+        '''
+        Add the objects from JSONL files to the database.
+
+        ``path`` is the name of a JSONL file or of a directory containing
+        JSONL files.
+        '''
+        for filename in _jsonl_filenames(path):
+            self.add(line for _, line in _iter_jsonl(filename))
+
+    def close(self):
+        '''
+        Close the database connection of the current thread.
+        '''
+        con = getattr(self._local, 'connection', None)
+        if con is not None:
+            con.close()
+            del self._local.connection
@@ -78,5 +78,11 @@ setup(
     author_email='transparenz@karlsruhe.de',
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        'export': ['pandas', 'pyarrow'],
+    },
+    entry_points={
+        'console_scripts': ['oparl-mirror = oparl.mirror:main'],
+    },
 )
 
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import os
+import threading
+import time
+
+import mock
+import pytest
+
+import oparl
+from oparl.cache import FileCache
+
+
+URL = 'https://example.org/oparl/body/1'
+
+DATA = {
+    'id': URL,
+    'type': 'https://schema.oparl.org/1.0/Body',
+    'name': 'Gemeinderat Öhringen',
+    'paper': [URL + '/paper/{}'.format(i) for i in range(100)],
+}
+
+CONTENT = json.dumps(DATA).encode('utf-8')
+
+
+class FakeRaw(object):
+    def tell(self):
+        return 123
+
+
+class FakeResponse(object):
+    delay = 0
+    encoding = None
+    raw = FakeRaw()
+    content = CONTENT
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        time.sleep(self.delay)
+        yield self.content
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cache(tmpdir):
+    cache = FileCache(str(tmpdir))
+    with mock.patch('oparl.CACHE', new=cache):
+        yield cache
+
+
+def test_filecache_stores_compressed_data(cache, tmpdir):
+    assert cache.get(URL) is None
+    assert URL not in cache
+    cache.set(URL, CONTENT)
+    assert URL in cache
+    assert cache.get(URL) == DATA
+    size = sum(os.path.getsize(str(f)) for f in tmpdir.visit()
+               if f.check(file=True))
+    assert size < len(CONTENT)
+
+
+def test_get_json_uses_cache(cache):
+    get = mock.Mock(return_value=FakeResponse())
+    with mock.patch('requests.get', new=get):
+        assert oparl._get_json(URL) == DATA
+        assert oparl._get_json(URL) == DATA
+    assert get.call_count == 1
+    assert 'gzip' in get.call_args[1]['headers']['Accept-Encoding']
+    assert cache.get(URL) == DATA
+
+
+def test_force_load_bypasses_cache(cache):
+    get = mock.Mock(return_value=FakeResponse())
+    with mock.patch('requests.get', new=get):
+        obj = oparl.from_id(URL)
+        obj.load(force=True)
+    assert get.call_count == 2
+
+
+def test_transfer_statistics():
+    stats = oparl.stats.copy()
+    with mock.patch('requests.get', return_value=FakeResponse()):
+        oparl._get_json(URL)
+    assert oparl.stats['requests'] == stats['requests'] + 1
+    assert (oparl.stats['compressed_bytes']
+            == stats['compressed_bytes'] + 123)
+    assert (oparl.stats['uncompressed_bytes']
+            == stats['uncompressed_bytes'] + len(CONTENT))
+
+
+def test_concurrent_downloads_are_coalesced():
+    response = FakeResponse()
+    response.delay = 0.1
+    get = mock.Mock(return_value=response)
+    coalesced = oparl.stats['coalesced_requests']
+    results = []
+
+    def load():
+        results.append(oparl._get_json(URL))
+
+    threads = [threading.Thread(target=load) for _ in range(5)]
+    with mock.patch('requests.get', new=get):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert get.call_count == 1
+    assert results == [DATA] * 5
+    assert oparl.stats['coalesced_requests'] == coalesced + 4
+
+
+def test_deadline_of_coalesced_download_does_not_affect_others():
+    response = FakeResponse()
+    response.delay = 0.3
+    get = mock.Mock(return_value=response)
+    results = {}
+
+    def load(name, seconds):
+        try:
+            with oparl.deadline(seconds):
+                results[name] = oparl._get_json(URL)
+        except oparl.DeadlineExceeded as e:
+            results[name] = e
+
+    short = threading.Thread(target=load, args=('short', 0.1))
+    unlimited = threading.Thread(target=load, args=('unlimited', None))
+    with mock.patch('requests.get', new=get):
+        short.start()
+        time.sleep(0.05)
+        unlimited.start()
+        short.join()
+        unlimited.join()
+    assert isinstance(results['short'], oparl.DeadlineExceeded)
+    assert results['unlimited'] == DATA
+    assert get.call_count == 2
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import threading
+import time
+
+import mock
+import pytest
+
+import oparl
+
+
+URL = 'https://example.org/oparl'
+
+CONTENT = b'{"id": "https://example.org/oparl"}'
+
+
+class FakeResponse(object):
+    encoding = None
+    content = CONTENT
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.raw = mock.Mock(tell=mock.Mock(return_value=len(CONTENT)))
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        time.sleep(self.delay)
+        yield self.content
+
+    def close(self):
+        pass
+
+
+def test_deadline_exceeded():
+    with mock.patch('requests.get', return_value=FakeResponse(0.2)):
+        with pytest.raises(oparl.DeadlineExceeded):
+            with oparl.deadline(0.05):
+                oparl._get_json(URL)
+
+
+def test_deadline_argument():
+    with mock.patch('requests.get', return_value=FakeResponse(0.2)):
+        with pytest.raises(oparl.DeadlineExceeded):
+            oparl.from_id(URL, deadline=0.05)
+
+
+def test_deadline_limits_timeout():
+    get = mock.Mock(return_value=FakeResponse())
+    with mock.patch('requests.get', new=get):
+        with mock.patch('oparl.TIMEOUT', new=(10, 60)):
+            with oparl.deadline(30):
+                oparl._get_json(URL)
+            connect, read = get.call_args[1]['timeout']
+            assert connect == 10
+            assert 29 < read <= 30
+            oparl._get_json(URL)
+            assert get.call_args[1]['timeout'] == (10, 60)
+
+
+def test_nested_deadlines():
+    with oparl.deadline(10):
+        with oparl.deadline(100):
+            assert oparl._remaining() <= 10
+        with oparl.deadline(1):
+            assert oparl._remaining() <= 1
+        assert 1 < oparl._remaining() <= 10
+    assert oparl._remaining() is None
+
+
+def test_hedged_request():
+    responses = [FakeResponse(1), FakeResponse()]
+    latencies = collections.deque([0.01] * 20, maxlen=100)
+    hedged = oparl.stats['hedged_requests']
+    start = time.time()
+    with mock.patch('requests.get', side_effect=responses):
+        with mock.patch('oparl._latencies', new=latencies):
+            with mock.patch('oparl.HEDGE_PERCENTILE', new=90):
+                assert oparl._get_json(URL) == {'id': URL}
+    assert time.time() - start < 0.5
+    assert oparl.stats['hedged_requests'] == hedged + 1
+
+
+class BlockingGetJSON(object):
+    '''
+    Replacement for ``oparl._get_json`` that blocks until released.
+    '''
+    def __init__(self, data):
+        self.data = data
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self, url, cached=True):
+        self.started.set()
+        self.released.wait()
+        return self.data[url]
+
+    def run(self, func):
+        thread = threading.Thread(target=func)
+        thread.start()
+        self.started.wait()
+        return thread
+
+
+def test_deadline_while_waiting_for_load():
+    data = {URL: {'id': URL, 'type': 'https://schema.oparl.org/1.0/Body'}}
+    get_json = BlockingGetJSON(data)
+    with mock.patch('oparl._get_json', new=get_json):
+        thread = get_json.run(oparl._lazy(URL, data[URL]['type']).load)
+        try:
+            start = time.time()
+            with pytest.raises(oparl.DeadlineExceeded):
+                oparl._lazy(URL, data[URL]['type']).load(deadline=0.05)
+            assert time.time() - start < 0.5
+        finally:
+            get_json.released.set()
+            thread.join()
+
+
+def test_deadline_while_waiting_for_page():
+    data = {'list': {'data': [], 'links': {}}}
+    get_json = BlockingGetJSON(data)
+    lst = oparl.ExternalObjectList('list')
+    with mock.patch('oparl._get_json', new=get_json):
+        thread = get_json.run(lambda: list(lst))
+        try:
+            start = time.time()
+            with mock.patch('oparl.DEADLINE', new=0.05):
+                with pytest.raises(oparl.DeadlineExceeded):
+                    list(lst)
+            assert time.time() - start < 0.5
+        finally:
+            get_json.released.set()
+            thread.join()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+
+import pytest
+
+from oparl.diff import diff, Change, CREATED, DELETED, UPDATED
+
+
+def paper(id, **fields):
+    data = {'id': id, 'type': 'https://schema.oparl.org/1.0/Paper'}
+    data.update(fields)
+    return data
+
+
+OLD = [
+    paper('a', name='A', modified='2016-01-01T00:00:00+01:00'),
+    paper('b', name='B', modified='2016-01-01T00:00:00+01:00'),
+    paper('c', name='C'),
+    paper('d', name='D'),
+    paper('e', name='E', deleted=True),
+]
+
+NEW = [
+    paper('a', name='A*', modified='2016-01-01T00:00:00+01:00'),
+    paper('b', name='B*', modified='2016-02-01T00:00:00+01:00'),
+    paper('c', name='C'),
+    paper('d', name='D', deleted=True),
+    paper('f', name='F'),
+]
+
+EXPECTED = [
+    (CREATED, 'f', None),
+    (DELETED, 'd', None),
+    (UPDATED, 'b', ['modified', 'name']),
+]
+
+
+def summarize(changes):
+    return sorted((c.kind, c.id, c.fields) for c in changes)
+
+
+def test_diff_sorted():
+    assert summarize(diff(OLD, NEW)) == EXPECTED
+
+
+def test_diff_indexed():
+    old = {data['id']: data for data in OLD}
+    new = {data['id']: data for data in NEW}
+    assert summarize(diff(old, new)) == EXPECTED
+
+
+def test_diff_jsonl_lines():
+    old = [json.dumps(data) + '\n' for data in OLD]
+    new = [json.dumps(data) + '\n' for data in NEW]
+    assert summarize(diff(old, new)) == EXPECTED
+
+
+def test_diff_binary_jsonl_lines():
+    # As read from files opened in binary mode, with trailing blank lines
+    old = [json.dumps(data).encode('utf-8') + b'\n' for data in OLD] + [b'\n']
+    new = [json.dumps(data).encode('utf-8') + b'\n' for data in NEW] + [b'\n']
+    assert summarize(diff(old, new)) == EXPECTED
+
+
+def test_diff_without_modified_fast_path():
+    changes = summarize(diff(OLD, NEW, use_modified=False))
+    assert (UPDATED, 'a', ['name']) in changes
+
+
+def test_diff_reports_missing_objects_as_deleted():
+    changes = list(diff(OLD[:2], OLD[:1]))
+    assert changes == [Change(DELETED, 'b', OLD[1], None, None)]
+
+
+def test_unsorted_snapshot_raises_valueerror():
+    with pytest.raises(ValueError) as e:
+        list(diff(OLD[::-1], NEW))
+    assert 'not sorted' in str(e.value)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import hashlib
+
+import mock
+import pytest
+
+import oparl
+from oparl.objects import download_files
+
+
+CONTENT = b'This is the content of the file. ' * 1000
+
+SHA1 = hashlib.sha1(CONTENT).hexdigest()
+
+
+class FakeResponse(object):
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeServer(object):
+    '''
+    Mock for ``requests.get`` that serves ``CONTENT``.
+    '''
+    def __init__(self, content=CONTENT, support_ranges=True):
+        self.content = content
+        self.support_ranges = support_ranges
+        self.requests = []
+
+    def __call__(self, url, headers=None, **kwargs):
+        self.requests.append(headers)
+        range = (headers or {}).get('Range')
+        if range and self.support_ranges:
+            start = int(range[len('bytes='):-1])
+            if start >= len(self.content):
+                return FakeResponse(b'', 416)
+            return FakeResponse(self.content[start:], 206)
+        return FakeResponse(self.content)
+
+
+def make_file(**fields):
+    data = {
+        'id': 'a-file',
+        'type': 'https://schema.oparl.org/1.0/File',
+        'accessUrl': 'http://example.org/file.pdf',
+    }
+    data.update(fields)
+    return oparl.from_json(data)
+
+
+def test_download(tmpdir):
+    filename = str(tmpdir.join('file.pdf'))
+    with mock.patch('requests.get', new=FakeServer()):
+        make_file(sha1Checksum=SHA1).download(filename)
+    with open(filename, 'rb') as f:
+        assert f.read() == CONTENT
+    assert not tmpdir.join('file.pdf.part').check()
+
+
+def test_download_is_resumed(tmpdir):
+    filename = str(tmpdir.join('file.pdf'))
+    tmpdir.join('file.pdf.part').write_binary(CONTENT[:1234])
+    server = FakeServer()
+    with mock.patch('requests.get', new=server):
+        make_file(sha1Checksum=SHA1, size=len(CONTENT)).download(filename)
+    assert server.requests[0]['Range'] == 'bytes=1234-'
+    with open(filename, 'rb') as f:
+        assert f.read() == CONTENT
+
+
+def test_download_restarts_if_server_ignores_range(tmpdir):
+    filename = str(tmpdir.join('file.pdf'))
+    tmpdir.join('file.pdf.part').write_binary(b'garbage')
+    with mock.patch('requests.get', new=FakeServer(support_ranges=False)):
+        make_file(sha1Checksum=SHA1).download(filename)
+    with open(filename, 'rb') as f:
+        assert f.read() == CONTENT
+
+
+def test_complete_download_is_skipped(tmpdir):
+    filename = str(tmpdir.join('file.pdf'))
+    tmpdir.join('file.pdf').write_binary(CONTENT)
+    server = FakeServer()
+    with mock.patch('requests.get', new=server):
+        make_file(sha1Checksum=SHA1).download(filename)
+    assert server.requests == []
+
+
+def test_checksum_mismatch_raises_checksumerror(tmpdir):
+    filename = str(tmpdir.join('file.pdf'))
+    with mock.patch('requests.get', new=FakeServer(b'wrong content')):
+        with pytest.raises(oparl.ChecksumError):
+            make_file(sha1Checksum=SHA1).download(filename)
+    assert not tmpdir.listdir()
+
+
+def test_download_files(tmpdir):
+    downloads = [(make_file(sha1Checksum=SHA1),
+                  str(tmpdir.join('{}.pdf'.format(i)))) for i in range(5)]
+    downloads.append((make_file(sha1Checksum='0' * 40),
+                      str(tmpdir.join('broken.pdf'))))
+    with mock.patch('requests.get', new=FakeServer()):
+        errors = download_files(downloads, max_workers=3)
+    assert errors[:5] == [None] * 5
+    assert isinstance(errors[5], oparl.ChecksumError)
+    assert len(tmpdir.listdir()) == 5
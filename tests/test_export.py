@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+import mock
+import pytest
+
+import oparl
+from oparl.export import (iter_dataframes, iter_record_batches, to_dataframe,
+                          to_table)
+
+
+def paper(i, **fields):
+    data = {
+        'id': 'paper-{}'.format(i),
+        'type': 'https://schema.oparl.org/1.0/Paper',
+        'name': 'Paper {}'.format(i),
+        'date': '2016-09-{:02d}'.format(i + 1),
+        'modified': '2016-09-{:02d}T12:00:00+02:00'.format(i + 1),
+        'body': 'a-body',
+        'originatorPerson': ['person-1', 'person-2'],
+        'mainFile': {
+            'id': 'file-{}'.format(i),
+            'type': 'https://schema.oparl.org/1.0/File',
+        },
+    }
+    data.update(fields)
+    return data
+
+
+PAGES = {
+    'papers': {
+        'data': [paper(0), paper(1, date='invalid')],
+        'links': {'next': 'papers-2'},
+    },
+    'papers-2': {
+        'data': [paper(2, modified='2016-09-03T10:00:00.5Z')],
+        'links': {},
+    },
+}
+
+FIELDS = ['id', 'date', 'modified', 'body', 'originatorPerson', 'mainFile']
+
+
+@pytest.fixture(autouse=True)
+def mock_get_json():
+    with mock.patch('oparl._get_json', new=PAGES.__getitem__):
+        yield
+
+
+def test_record_batches():
+    pytest.importorskip('pyarrow')
+    papers = oparl.ExternalObjectList('papers')
+    batches = list(iter_record_batches(papers, FIELDS))
+    assert [batch.num_rows for batch in batches] == [2, 1]
+    assert batches[0].schema == batches[1].schema
+    table = to_table(papers, FIELDS)
+    columns = table.to_pydict()
+    assert columns['id'] == ['paper-0', 'paper-1', 'paper-2']
+    assert columns['date'] == [datetime.date(2016, 9, 1), None,
+                               datetime.date(2016, 9, 3)]
+    assert [d.hour for d in columns['modified']] == [10, 10, 10]
+    assert columns['body'] == ['a-body'] * 3
+    assert columns['originatorPerson'][0] == ['person-1', 'person-2']
+    assert columns['mainFile'] == ['file-0', 'file-1', 'file-2']
+
+
+def test_invalid_datetimes_only_affect_themselves():
+    pytest.importorskip('pyarrow')
+    pages = {'papers': {'data': [
+        paper(0, modified='garbage'),
+        paper(1, modified='2016-09-01T12:00:00.5Z'),
+        paper(2, modified='2016-09-01T12:00:00'),
+        paper(3, modified='2016-09-01T12:00:00+02:00'),
+    ], 'links': {}}}
+    with mock.patch('oparl._get_json', new=pages.__getitem__):
+        table = to_table(oparl.ExternalObjectList('papers'), ['modified'])
+    modified = table.to_pydict()['modified']
+    assert modified[0] is None
+    assert [(d.hour, d.microsecond) for d in modified[1:]] == \
+        [(12, 500000), (12, 0), (10, 0)]
+
+
+def test_types_of_later_pages():
+    pytest.importorskip('pyarrow')
+    pages = {
+        'papers': {
+            'data': [paper(0, keyword=[], count=1, note=None)],
+            'links': {'next': 'papers-2'},
+        },
+        'papers-2': {
+            'data': [paper(1, keyword=['foo'], count=1.5, note='bar')],
+            'links': {},
+        },
+    }
+    fields = ['keyword', 'count', 'note', 'originatorPerson']
+    with mock.patch('oparl._get_json', new=pages.__getitem__):
+        papers = oparl.ExternalObjectList('papers')
+        batches = list(iter_record_batches(papers, fields))
+        table = to_table(papers, fields)
+    assert str(batches[0].schema.field('originatorPerson').type) == \
+        'list<item: string>'
+    assert table.schema == batches[1].schema
+    columns = table.to_pydict()
+    assert columns['keyword'] == [[], ['foo']]
+    assert columns['count'] == [1.0, 1.5]
+    assert columns['note'] == [None, 'bar']
+
+
+def test_incompatible_types_raise_valueerror():
+    pytest.importorskip('pyarrow')
+    pages = {
+        'papers': {'data': [paper(0, count=1)], 'links': {'next': 'p2'}},
+        'p2': {'data': [paper(1, count='one')], 'links': {}},
+    }
+    with mock.patch('oparl._get_json', new=pages.__getitem__):
+        with pytest.raises(ValueError):
+            to_table(oparl.ExternalObjectList('papers'), ['count'])
+
+
+def test_dataframes():
+    pandas = pytest.importorskip('pandas')
+    papers = oparl.ExternalObjectList('papers')
+    assert [len(f) for f in iter_dataframes(papers, FIELDS)] == [2, 1]
+    frame = to_dataframe(papers, FIELDS)
+    assert list(frame.columns) == FIELDS
+    assert list(frame['id']) == ['paper-0', 'paper-1', 'paper-2']
+    assert frame['date'][0] == pandas.Timestamp('2016-09-01')
+    assert pandas.isnull(frame['date'][1])
+    assert list(frame['modified'].dt.hour) == [10, 10, 10]
+    assert list(frame['mainFile']) == ['file-0', 'file-1', 'file-2']
+
+
+def test_default_fields():
+    pytest.importorskip('pandas')
+    frame = to_dataframe(oparl.ExternalObjectList('papers'))
+    assert set(frame.columns) == set(paper(0))
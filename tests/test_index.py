@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import mock
+import pytest
+
+import oparl
+from oparl.index import Index
+from oparl.objects import Membership, Person
+
+
+@pytest.fixture
+def index():
+    index = Index()
+    with mock.patch('oparl.INDEX', new=index):
+        yield index
+
+
+def membership(id, person, organization):
+    return oparl.from_json({
+        'id': id,
+        'type': 'https://schema.oparl.org/1.0/Membership',
+        'person': person,
+        'organization': organization,
+    })
+
+
+def ids(objects):
+    return sorted(obj['id'] for obj in objects)
+
+
+def test_loaded_objects_are_indexed(index):
+    membership('m1', 'p1', 'o1')
+    membership('m2', 'p2', 'o1')
+    membership('m3', 'p1', 'o2')
+    assert ids(index.referrers('o1')) == ['m1', 'm2']
+    assert ids(index.referrers('p1', field='person')) == ['m1', 'm3']
+    assert index.referrers('p1', field='organization') == []
+    assert ids(index.references('m3')) == ['o2', 'p1']
+    referrers = index.referrers('o1', cls=Membership)
+    assert all(isinstance(obj, Membership) for obj in referrers)
+    assert not referrers[0].loaded
+    assert index.referrers('o1', cls=Person) == []
+
+
+def test_reference_lists_are_indexed(index):
+    oparl.from_json({
+        'id': 'meeting',
+        'type': 'https://schema.oparl.org/1.0/Meeting',
+        'participant': ['p1', 'p2'],
+    })
+    assert ids(index.referrers('p2', field='participant')) == ['meeting']
+    assert ids(index.references('meeting')) == ['p1', 'p2']
+
+
+def test_reindexing_replaces_references(index):
+    membership('m1', 'p1', 'o1')
+    membership('m1', 'p1', 'o2')
+    assert index.referrers('o1') == []
+    assert ids(index.referrers('o2')) == ['m1']
+    assert ids(index.referrers('p1')) == ['m1']
+
+
+def test_unknown_object(index):
+    assert index.referrers('does-not-exist') == []
+    assert 'does-not-exist' not in index
+
+
+def test_readding_shared_target(index):
+    for i in range(5):
+        membership('m{}'.format(i), 'p{}'.format(i), 'o1')
+    # Unchanged references
+    membership('m2', 'p2', 'o1')
+    assert ids(index.referrers('o1')) == ['m0', 'm1', 'm2', 'm3', 'm4']
+    membership('m2', 'p2', 'o2')
+    assert ids(index.referrers('o1')) == ['m0', 'm1', 'm3', 'm4']
+    assert ids(index.referrers('o2')) == ['m2']
+    assert ids(index.references('m2')) == ['o2', 'p2']
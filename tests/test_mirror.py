@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import socket
+import threading
+
+import mock
+import pytest
+import requests
+
+import oparl
+from oparl.mirror import crawl, MirrorServer, MirrorStore
+
+
+HOST = 'https://oparl.example.org'
+
+ORIGIN = HOST + '/oparl'
+
+
+def obj(id, type, **kwargs):
+    kwargs['id'] = ORIGIN + id
+    kwargs['type'] = 'https://schema.oparl.org/1.0/' + type
+    return kwargs
+
+
+def page(items, next=None):
+    return {'data': items, 'links': {'next': next} if next else {}}
+
+
+PAPERS = [
+    obj('/paper/{}'.format(i), 'Paper', name='Paper {}'.format(i),
+        modified='2017-01-0{}T12:00:00+01:00'.format(i),
+        location=[obj('/paper/{}/location'.format(i), 'Location')],
+        underDirectionOf=[ORIGIN + '/organization/1'])
+    for i in range(1, 4)
+]
+
+PAPERS[0]['mainFile'] = obj('/file/1', 'File',
+                            accessUrl=ORIGIN + '/file/1/download')
+PAPERS[0]['web'] = HOST + '/oparl-archive/paper/1'
+
+
+DATA = {
+    ORIGIN + '/system': obj('/system', 'System', body=ORIGIN + '/bodies'),
+    ORIGIN + '/bodies': page([obj('/body/1', 'Body',
+                                  paper=ORIGIN + '/body/1/papers',
+                                  meeting=ORIGIN + '/body/1/meetings')]),
+    ORIGIN + '/body/1/meetings': page([]),
+    ORIGIN + '/body/1/papers': page(PAPERS[:2],
+                                    ORIGIN + '/body/1/papers?page=2'),
+    ORIGIN + '/body/1/papers?page=2': page(PAPERS[2:]),
+    ORIGIN + '/organization/1': obj('/organization/1', 'Organization'),
+}
+
+
+@pytest.fixture
+def store(tmpdir):
+    store = MirrorStore(str(tmpdir.join('mirror.sqlite')))
+    with mock.patch('oparl.SOURCES', new=[DATA]):
+        crawl(ORIGIN + '/system', store)
+    yield store
+    store.close()
+
+
+def start_server(store, path='', origin=None):
+    # Find a free port, so that the base URL can be passed to the server
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    base_url = 'http://127.0.0.1:{}{}'.format(port, path)
+    server = MirrorServer(('127.0.0.1', port), store, base_url, origin)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=['', '/mirror'])
+def server(request, store):
+    server = start_server(store, request.param)
+    yield server
+    stop_server(server)
+
+
+def test_crawl(store):
+    assert store.origin == HOST
+    assert store.system == ORIGIN + '/system'
+    # System, body, papers, embedded locations and file, and referenced
+    # organization
+    assert len(store) == 10
+    assert ORIGIN + '/paper/2/location' in store
+    assert ORIGIN + '/organization/1' in store
+    assert store.is_list(ORIGIN + '/body/1/papers')
+    assert not store.is_list(ORIGIN + '/body/1/papers?page=2')
+    assert store.is_list(ORIGIN + '/body/1/meetings')
+    assert store.list_page(ORIGIN + '/body/1/meetings') == []
+    rows = store.list_page(ORIGIN + '/body/1/papers')
+    assert [json.loads(data)['id'] for _, data in rows] == \
+        [paper['id'] for paper in PAPERS]
+
+
+def test_list_page_modified(store):
+    url = ORIGIN + '/body/1/papers'
+    rows = store.list_page(url, modified_since='2017-01-02T11:00:00Z')
+    assert [position for position, _ in rows] == [1, 2]
+    rows = store.list_page(url, modified_until='2017-01-02T10:59:59Z')
+    assert [position for position, _ in rows] == [0]
+
+
+def test_serve(server):
+    base = server.base_url
+    with mock.patch('oparl.SOURCES', new=[]), \
+            mock.patch('oparl.mirror.PAGE_SIZE', new=2):
+        system = oparl.from_id(base)
+        assert system['id'] == base + '/oparl/system'
+        body = list(system['body'])[0]
+        assert body['id'] == base + '/oparl/body/1'
+        assert list(body['meeting']) == []
+        papers = list(body['paper'])
+        assert [paper['id'] for paper in papers] == \
+            [base + '/oparl/paper/{}'.format(i) for i in range(1, 4)]
+        assert papers[0]['location'][0]['id'] == \
+            base + '/oparl/paper/1/location'
+        # URLs which are not served by the mirror are not rewritten
+        main_file = papers[0]['mainFile']
+        assert main_file['id'] == base + '/oparl/file/1'
+        assert main_file['accessUrl'] == ORIGIN + '/file/1/download'
+        assert papers[0]['web'] == HOST + '/oparl-archive/paper/1'
+        organization = papers[0]['underDirectionOf'][0]
+        organization.load()
+        assert organization['type'] == \
+            'https://schema.oparl.org/1.0/Organization'
+
+
+def test_serve_list_filter(server):
+    url = server.base_url + '/oparl/body/1/papers'
+    data = requests.get(url, params={
+        'modified_since': '2017-01-02T11:00:00Z', 'limit': 1}).json()
+    assert [paper['name'] for paper in data['data']] == ['Paper 2']
+    assert data['pagination'] == {'elementsPerPage': 1}
+    data = requests.get(data['links']['next']).json()
+    assert [paper['name'] for paper in data['data']] == ['Paper 3']
+    data = requests.get(data['links']['next']).json()
+    assert data['data'] == []
+    assert 'next' not in data['links']
+
+
+def test_serve_errors(server):
+    response = requests.get(server.base_url + '/does-not-exist')
+    assert response.status_code == 404
+    if server.base_path:
+        response = requests.get(server.base_url.replace(server.base_path,
+                                                        '/oparl/body/1'))
+        assert response.status_code == 404
+    response = requests.get(server.base_url + '/oparl/body/1/papers',
+                            params={'modified_since': 'foo'})
+    assert response.status_code == 400
+
+
+def test_serve_origin(store):
+    server = start_server(store, origin=ORIGIN)
+    try:
+        base = server.base_url
+        system = requests.get(base + '/system').json()
+        assert system['id'] == base + '/system'
+        assert system['body'] == base + '/bodies'
+        assert requests.get(base).json() == system
+    finally:
+        stop_server(server)
@@ -24,8 +24,15 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import datetime
+import json
+import subprocess
+import sys
+import threading
+import time
 import warnings
 
+import dateutil.parser
 import mock
 import pytest
 import six
@@ -49,6 +56,65 @@ OBJECTS = {
         'id': 'a-location',
         'type': 'https://schema.oparl.org/1.0/Location',
     },
+    'a-meeting': {
+        'id': 'a-meeting',
+        'type': 'https://schema.oparl.org/1.0/Meeting',
+        'organization': ['an-organization'],
+        'participant': ['a-person', 'another-person'],
+        'agendaItem': [{
+            'id': 'an-agendaitem',
+            'type': 'https://schema.oparl.org/1.0/AgendaItem',
+            'meeting': 'a-meeting',
+            'consultation': 'a-consultation',
+        }, {
+            'id': 'another-agendaitem',
+            'type': 'https://schema.oparl.org/1.0/AgendaItem',
+            'meeting': 'a-meeting',
+            'consultation': 'a-consultation',
+        }],
+    },
+    'an-organization': {
+        'id': 'an-organization',
+        'type': 'https://schema.oparl.org/1.0/Organization',
+        'body': 'a-body',
+    },
+    'a-person': {
+        'id': 'a-person',
+        'type': 'https://schema.oparl.org/1.0/Person',
+        'body': 'a-body',
+    },
+    'another-person': {
+        'id': 'another-person',
+        'type': 'https://schema.oparl.org/1.0/Person',
+        'body': 'a-body',
+    },
+    'a-consultation': {
+        'id': 'a-consultation',
+        'type': 'https://schema.oparl.org/1.0/Consultation',
+        'paper': 'a-paper',
+    },
+    'a-body': {
+        'id': 'a-body',
+        'type': 'https://schema.oparl.org/1.0/Body',
+    },
+    'a-meeting-list': {
+        'data': [{
+            'id': 'a-meeting-in-a-list',
+            'type': 'https://schema.oparl.org/1.0/Meeting',
+            'participant': ['a-person', 'another-person'],
+        }],
+        'links': {
+            'next': 'a-meeting-list-page-2',
+        },
+    },
+    'a-meeting-list-page-2': {
+        'data': [{
+            'id': 'another-meeting-in-a-list',
+            'type': 'https://schema.oparl.org/1.0/Meeting',
+            'participant': ['a-person'],
+        }],
+        'links': {},
+    },
 }
 
 
@@ -238,3 +304,214 @@ def test_unknown_type_raises_valueerror():
         }''')
     assert 'Unknown type' in str(e.value)
 
+
+@pytest.mark.parametrize('value', [
+    '2016-09-01T12:30:05+02:00',
+    '2016-09-01T12:30:05-0130',
+    '2016-09-01T12:30:05Z',
+    '2016-09-01T12:30:05.25+02:00',
+    '2016-09-01T12:30:05',
+    '2016-09-01 12:30',
+])
+def test_datetime_parsing_matches_dateutil(value):
+    assert oparl._parse_datetime(value) == dateutil.parser.parse(value)
+
+
+def test_date_parsing():
+    assert oparl._parse_date('2016-09-01') == datetime.date(2016, 9, 1)
+    assert oparl._parse_date('1. September 2016') == datetime.date(2016, 9, 1)
+    with pytest.raises(ValueError):
+        oparl._parse_date('2016-02-30')
+
+
+HEAVY_MODULES = ['requests', 'dateutil', 'unidecode']
+
+
+def test_import_does_not_load_heavy_dependencies():
+    code = '''if True:
+        import json
+        import sys
+        import oparl
+        oparl.from_json({
+            "id": "a-paper",
+            "type": "https://schema.oparl.org/1.0/Paper",
+            "date": "2016-09-01",
+            "modified": "2016-09-01T12:30:05+02:00",
+            "body": "a-body"
+        })
+        print(json.dumps(sorted(set(name.split('.')[0]
+                                    for name in sys.modules))))
+    '''
+    args = [sys.executable]
+    if sys.version_info >= (3, 7):
+        # Additionally check the imports reported by the interpreter
+        args += ['-X', 'importtime']
+    process = subprocess.Popen(args + ['-c', code], stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    assert process.returncode == 0, stderr
+    modules = set(json.loads(stdout.decode('utf-8').splitlines()[-1]))
+    assert 'oparl' in modules
+    imported = set()
+    for line in stderr.decode('utf-8').splitlines():
+        if line.startswith('import time:'):
+            imported.add(line.rsplit('|', 1)[-1].strip().split('.')[0])
+    if sys.version_info >= (3, 7):
+        assert 'oparl' in imported
+    for module in HEAVY_MODULES:
+        assert module not in modules
+        assert module not in imported
+
+
+def test_load_with_depth():
+    get_json = mock.Mock(side_effect=OBJECTS.__getitem__)
+    with mock.patch('oparl._get_json', new=get_json):
+        meeting = oparl._lazy('a-meeting',
+                              'https://schema.oparl.org/1.0/Meeting')
+        meeting.load(depth=2, fields=['organization', 'participant',
+                                      'agendaItem', 'consultation'])
+    loaded = sorted(call[0][0] for call in get_json.call_args_list)
+    assert loaded == ['a-consultation', 'a-meeting', 'a-person',
+                      'an-organization', 'another-person']
+    assert meeting['organization'][0].loaded
+    assert not meeting['organization'][0]['body'].loaded
+    for item in meeting['agendaItem']:
+        assert item['consultation'].loaded
+        assert not item['consultation']['paper'].loaded
+
+
+def test_load_with_depth_follows_all_fields():
+    get_json = mock.Mock(side_effect=OBJECTS.__getitem__)
+    with mock.patch('oparl._get_json', new=get_json):
+        meeting = oparl.from_id('a-meeting')
+        meeting.load(depth=2)
+    assert meeting['participant'][0]['body'].loaded
+    assert get_json.call_args_list.count(mock.call('a-body')) == 1
+    assert get_json.call_args_list.count(mock.call('a-meeting')) == 1
+    assert meeting['agendaItem'][0]['meeting'].loaded
+
+
+def test_external_list_expand():
+    get_json = mock.Mock(side_effect=OBJECTS.__getitem__)
+    with mock.patch('oparl._get_json', new=get_json):
+        meetings = list(oparl.ExternalObjectList('a-meeting-list').expand())
+    assert [m['id'] for m in meetings] == ['a-meeting-in-a-list',
+                                           'another-meeting-in-a-list']
+    assert all(p.loaded for m in meetings for p in m['participant'])
+
+
+def slow_get_json(url):
+    time.sleep(0.05)
+    return OBJECTS[url]
+
+
+def run_in_threads(func, count=4):
+    threads = [threading.Thread(target=func) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_external_list_iterators_are_independent():
+    meetings = oparl.ExternalObjectList('a-meeting-list')
+    first = iter(meetings)
+    second = iter(meetings)
+    assert next(first)['id'] == 'a-meeting-in-a-list'
+    assert next(first)['id'] == 'another-meeting-in-a-list'
+    assert next(second)['id'] == 'a-meeting-in-a-list'
+    assert meetings[1]['id'] == 'another-meeting-in-a-list'
+    assert meetings[0]['id'] == 'a-meeting-in-a-list'
+    assert next(second)['id'] == 'another-meeting-in-a-list'
+    with pytest.raises(StopIteration):
+        next(first)
+    with pytest.raises(IndexError):
+        meetings[2]
+    assert len(meetings) == 2
+
+
+def test_external_list_can_be_shared_between_threads():
+    get_json = mock.Mock(side_effect=slow_get_json)
+    meetings = oparl.ExternalObjectList('a-meeting-list')
+    results = []
+
+    def iterate():
+        results.append([m['id'] for m in meetings])
+
+    with mock.patch('oparl._get_json', new=get_json):
+        run_in_threads(iterate)
+    assert results == [['a-meeting-in-a-list',
+                        'another-meeting-in-a-list']] * 4
+    assert get_json.call_count == 2
+
+
+def test_concurrent_loads_download_once():
+    get_json = mock.Mock(side_effect=slow_get_json)
+    person = oparl._lazy('a-person', 'https://schema.oparl.org/1.0/Person')
+    with mock.patch('oparl._get_json', new=get_json):
+        run_in_threads(person.load)
+    assert get_json.call_count == 1
+    assert person.loaded
+
+
+MANY = [{
+    'id': 'paper-{}'.format(i),
+    'type': 'https://schema.oparl.org/1.0/Paper',
+    'name': 'Paper {}'.format(i),
+    'date': '2016-09-{:02d}'.format(i % 3 + 1),
+    'modified': '2016-09-01T12:30:05+02:00',
+    'body': 'a-body',
+    'originatorPerson': ['a-person', 'another-person'],
+    'mainFile': {
+        'id': 'file-{}'.format(i),
+        'type': 'https://schema.oparl.org/1.0/File',
+        'date': '2016-09-01',
+        'paper': ['paper-{}'.format(i)],
+    },
+    'consultation': [{
+        'id': 'consultation-{}'.format(i),
+        'type': 'https://schema.oparl.org/1.0/Consultation',
+        'meeting': 'a-meeting',
+    }],
+} for i in range(5)] + [{
+    'id': 'a-system',
+    'type': 'https://schema.oparl.org/1.0/System',
+    'body': 'a-body-list',
+}]
+
+
+def summarize(value):
+    if isinstance(value, oparl.Object):
+        return (value.__class__, value.loaded,
+                dict((k, summarize(v)) for k, v in value._data.items()))
+    if isinstance(value, list):
+        return [summarize(v) for v in value]
+    if isinstance(value, oparl.ExternalObjectList):
+        return (oparl.ExternalObjectList, value.url)
+    return value
+
+
+def test_from_json_many_matches_from_json():
+    expected = [summarize(oparl.from_json(data)) for data in MANY]
+    assert [summarize(obj) for obj in oparl.from_json_many(MANY)] == expected
+
+
+def test_from_json_many_warns_for_each_object():
+    data = [{
+        'id': 'object-with-invalid-date-{}'.format(i),
+        'type': 'https://schema.oparl.org/1.0/Organization',
+        'startDate': 'this is not a date',
+    } for i in range(2)]
+    with pytest.warns(oparl.ContentWarning) as record:
+        objects = oparl.from_json_many(data)
+    assert len(record) == 2
+    assert objects[1]['startDate'] == 'this is not a date'
+
+
+def test_from_json_many_requires_id_and_type():
+    with pytest.raises(ValueError) as e:
+        oparl.from_json_many([MANY[0], {'type': MANY[0]['type']}])
+    assert 'does not have an `id` field' in str(e.value)
+    with pytest.raises(ValueError) as e:
+        oparl.from_json_many(['{"id": "does-not-exist"}'])
+    assert 'does not have a `type` field' in str(e.value)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import pytest
+
+import oparl
+from oparl import profiling
+from oparl.objects import Meeting
+
+
+MEETING = {
+    'id': 'meeting',
+    'type': 'https://schema.oparl.org/1.0/Meeting',
+    'start': '2017-01-01T12:00:00+01:00',
+    'agendaItem': [{
+        'id': 'agenda-item-{}'.format(i),
+        'type': 'https://schema.oparl.org/1.0/AgendaItem',
+        'start': '2017-01-01T12:00:00+01:00',
+    } for i in range(3)],
+}
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def entries():
+    return dict((entry[:3], entry) for entry in profiling.results())
+
+
+def test_disabled_by_default():
+    convert_value = oparl.Object._convert_value
+    oparl.from_json(MEETING)
+    assert profiling.results() == []
+    with profiling.profile():
+        assert oparl.Object._convert_value is not convert_value
+    assert oparl.Object._convert_value is convert_value
+    assert oparl.from_json_many is not profiling.from_json_many
+
+
+def test_results():
+    with profiling.profile():
+        oparl.from_json(MEETING)
+    results = entries()
+    assert set(results) == {
+        ('Meeting', None, 'from_json'),
+        ('Meeting', 'start', 'datetime'),
+        ('Meeting', 'agendaItem', 'object_list'),
+        ('AgendaItem', None, 'from_json'),
+        ('AgendaItem', 'start', 'datetime'),
+    }
+    assert results['AgendaItem', None, 'from_json'].calls == 3
+    assert results['Meeting', 'agendaItem', 'object_list'].calls == 1
+    meeting = results['Meeting', None, 'from_json']
+    agenda_items = results['Meeting', 'agendaItem', 'object_list']
+    assert meeting.total >= agenda_items.total >= \
+        results['AgendaItem', None, 'from_json'].total
+    assert meeting.own <= meeting.total - agenda_items.total + 1e-9
+    assert profiling.results()[0] == meeting
+
+
+def test_from_json_many():
+    paper = {'id': 'paper', 'type': 'https://schema.oparl.org/1.0/Paper',
+             'date': '2017-01-01'}
+    with profiling.profile():
+        objects = oparl.from_json_many([MEETING, paper, MEETING])
+    assert isinstance(objects[0], Meeting)
+    results = entries()
+    # The embedded agenda items are converted in a nested batch
+    assert results[None, None, 'from_json_many'].calls == 2
+    assert results['Meeting', None, 'from_json'].calls == 2
+    assert results['Paper', None, 'from_json'].calls == 1
+    assert results['AgendaItem', None, 'from_json'].calls == 6
+    assert results['Meeting', 'start', 'datetime'].calls == 2
+    assert results['Paper', 'date', 'date'].calls == 1
+    assert results['AgendaItem', 'start', 'datetime'].calls == 6
+    meeting = results['Meeting', None, 'from_json']
+    assert meeting.total >= results['Meeting', 'agendaItem',
+                                    'object_list'].total
+
+
+def test_report_and_collapsed():
+    with profiling.profile():
+        oparl.from_json(MEETING)
+    report = profiling.report(limit=2).splitlines()
+    assert len(report) == 3
+    assert report[1].endswith('Meeting (from_json)')
+    paths = [line.rsplit(' ', 1)[0]
+             for line in profiling.collapsed().splitlines()]
+    assert ('Meeting (from_json);Meeting.agendaItem (object_list);'
+            + 'AgendaItem (from_json)') in paths
+    for line in profiling.collapsed().splitlines():
+        assert int(line.rsplit(' ', 1)[1]) > 0
+    with pytest.raises(ValueError):
+        profiling.results(sort='foo')
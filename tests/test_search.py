@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+
+import pytest
+
+import oparl
+from oparl.search import SearchIndex
+
+
+def paper(id, name, modified='2016-09-01T12:00:00+02:00', **fields):
+    data = {
+        'id': id,
+        'type': 'https://schema.oparl.org/1.0/Paper',
+        'name': name,
+        'modified': modified,
+    }
+    data.update(fields)
+    return data
+
+
+PAPERS = [
+    paper('p1', 'Neubau des Rathauses', reference='2016/001'),
+    paper('p2', 'Haushalt 2017: Sanierung des alten Rathauses'),
+    paper('p3', 'Rathauses Neubau? Nein: Haushalt Haushalt Haushalt'),
+    paper('p4', 'Straßenbahn in die Südstadt'),
+]
+
+
+@pytest.fixture
+def index(tmpdir):
+    index = SearchIndex(str(tmpdir.join('index.sqlite')))
+    index.update(PAPERS)
+    return index
+
+
+def ids(objects):
+    return [obj['id'] for obj in objects]
+
+
+def test_keyword_search(index):
+    assert len(index) == 4
+    assert sorted(ids(index.search('rathauses'))) == ['p1', 'p2', 'p3']
+    assert ids(index.search('Haushalt')) == ['p3', 'p2']
+    assert ids(index.search('haushalt sanierung')) == ['p2']
+    assert ids(index.search('südstadt')) == ['p4']
+    assert ids(index.search('2016')) == ['p1']
+    assert index.search('nothing') == []
+    assert index.search('') == []
+
+
+def test_phrase_search(index):
+    assert ids(index.search('"neubau des rathauses"')) == ['p1']
+    assert ids(index.search('"rathauses neubau"')) == ['p3']
+
+
+def test_phrase_search_limit(index):
+    index.update(paper('x{}'.format(i), 'Das neue Rathaus {}'.format(i))
+                 for i in range(20))
+    assert len(index.search('"neue rathaus"', limit=5)) == 5
+    assert index.search('"rathaus neue"') == []
+
+
+def test_totals(index):
+    index.remove('p2')
+    index.update([paper('p5', 'Haushalt 2018')])
+    con = index._connection()
+    totals = con.execute('SELECT documents, length FROM totals').fetchone()
+    assert totals == con.execute(
+        'SELECT COUNT(*), SUM(length) FROM documents').fetchone()
+
+
+def test_results_are_lazy_objects(index):
+    result = index.search('südstadt')[0]
+    assert isinstance(result, oparl.objects.Paper)
+    assert not result.loaded
+
+
+def test_incremental_update(index):
+    assert index.update(PAPERS) == 0
+    changed = paper('p4', 'Stadtbahn in die Nordstadt',
+                    modified='2016-10-01T12:00:00+02:00')
+    assert index.update([json.dumps(changed).encode('utf-8') + b'\n',
+                         b'\n', '']) == 1
+    assert index.search('südstadt') == []
+    assert ids(index.search('nordstadt')) == ['p4']
+    deleted = paper('p1', 'Neubau des Rathauses', deleted=True)
+    assert index.add(deleted)
+    assert 'p1' not in ids(index.search('rathauses'))
+    assert len(index) == 3
+
+
+def test_indexing_objects(index):
+    obj = oparl.from_json(paper('p5', 'Radweg am Rhein'))
+    assert index.add(obj)
+    assert ids(index.search('radweg')) == ['p5']
+    assert not index.add(obj)
+
+
+def test_other_types_are_ignored(index):
+    assert not index.add({
+        'id': 'a-person',
+        'type': 'https://schema.oparl.org/1.0/Person',
+        'name': 'Rathauses',
+    })
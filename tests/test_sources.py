@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (c) 2016, Stadt Karlsruhe (www.karlsruhe.de)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+
+import mock
+import pytest
+
+import oparl
+from oparl.sources import JSONLSource, SQLiteSource
+
+
+def person(i):
+    return {
+        'id': 'https://example.org/person/{}'.format(i),
+        'type': 'https://schema.oparl.org/1.0/Person',
+        'name': 'Person Nummer {} (Müller)'.format(i),
+        'body': 'https://example.org/body',
+    }
+
+
+PERSONS = [person(i) for i in range(10)]
+
+
+@pytest.fixture
+def jsonl_dir(tmpdir):
+    for k in range(2):
+        with tmpdir.join('dump-{}.jsonl'.format(k)).open('wb') as f:
+            for data in PERSONS[k::2]:
+                f.write(json.dumps(data).encode('utf-8') + b'\n')
+            f.write(b'\n')
+    tmpdir.join('empty.jsonl').write_binary(b'')
+    tmpdir.join('not-a-dump.txt').write_binary(b'Nothing to see here')
+    return tmpdir
+
+
+def test_jsonl_source(jsonl_dir):
+    source = JSONLSource(str(jsonl_dir))
+    assert len(source) == len(PERSONS)
+    for data in PERSONS:
+        assert data['id'] in source
+        assert source.get(data['id']) == data
+    assert source.get('does-not-exist') is None
+    source.close()
+
+
+def test_sqlite_source(jsonl_dir):
+    source = SQLiteSource(str(jsonl_dir.join('dump.sqlite')))
+    source.add_jsonl(str(jsonl_dir))
+    source.add([json.dumps(PERSONS[0])])
+    assert len(source) == len(PERSONS)
+    for data in PERSONS:
+        assert source.get(data['id']) == data
+    assert source.get('does-not-exist') is None
+    assert 'does-not-exist' not in source
+
+
+def test_sources_are_used_before_network(jsonl_dir):
+    source = JSONLSource(str(jsonl_dir))
+    get = mock.Mock()
+    with mock.patch('oparl.SOURCES', new=[source]):
+        with mock.patch('requests.get', new=get):
+            obj = oparl.from_id(PERSONS[3]['id'])
+            assert obj['name'] == PERSONS[3]['name']
+            assert not obj['body'].loaded
+    assert not get.called